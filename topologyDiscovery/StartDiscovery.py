@@ -9,20 +9,46 @@ import os
 import json
 import yaml
 import argparse
+import ipaddress
 from datetime import datetime
 from typing import Dict, List, Set, Optional, Any
 from dataclasses import dataclass
+from functools import lru_cache
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# The discovery package imports the flat modules next to this script (ssh_client, data_model, ...)
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if _SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, _SCRIPT_DIR)
+
+try:
+    import orjson  # Optional, much faster JSON output
+except ImportError:
+    orjson = None
 
 # Import logging
 from logging_config import setup_logging, get_logger
 
 # Import existing modules
-from switch_detector import SwitchDetector
-from discovery.HirschmannDiscovery import HirschmannDiscovery
-from discovery.LantechDiscovery import LantechDiscovery
-from discovery.KontronDiscovery import KontronDiscovery
-from discovery.NomadDiscovery import NomadDiscovery
+from switch_detector import SwitchDetector, VENDOR_CACHE_FILE
+from discovery import make_discovery, SUPPORTED_VENDORS
 from data_model import NetworkTopology, SwitchInfo, NeighborInfo
+from ssh_client import connection_pool
+
+
+# LibYAML-backed dumper when PyYAML was built with it
+_YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+
+@lru_cache(maxsize=4096)
+def _is_valid_ip(ip: str) -> bool:
+    """Check that an LLDP management address is a well-formed IP address (no leading zeros)."""
+    try:
+        ipaddress.ip_address(ip)
+        return True
+    except ValueError:
+        return False
 
 
 class NetworkDiscoveryManager:
@@ -30,26 +56,23 @@ class NetworkDiscoveryManager:
     Main class that orchestrates the network discovery process.
     """
     
-    def __init__(self, credentials_file: str = "credentials.yaml"):
+    def __init__(self, credentials_file: str = "credentials.yaml", max_workers: int = 16,
+                 vendor_cache_file: Optional[str] = None):
         """
         Initialize the network discovery manager.
         
         Args:
             credentials_file: Path to credentials configuration file
+            max_workers: Number of switches discovered concurrently (1 = sequential)
+            vendor_cache_file: File remembering detected vendors between runs (None disables it)
         """
         self.logger = get_logger(__name__)
-        self.detector = SwitchDetector(credentials_file)
+        self.detector = SwitchDetector(credentials_file, vendor_cache_file=vendor_cache_file)
         self.discovered_switches: Set[str] = set()
         self.failed_switches: Set[str] = set()
+        self.partial_switches: Set[str] = set()  # Vendor detected, but no discovery class for it
         self.topology = NetworkTopology()
-        
-        # Vendor to discovery class mapping
-        self.discovery_classes = {
-            'hirschmann': HirschmannDiscovery,
-            'lantech': LantechDiscovery,
-            'kontron': KontronDiscovery,
-            'nomad': NomadDiscovery
-        }
+        self.max_workers = max(1, max_workers)
     
     def discover_network(self, seed_ip: str) -> NetworkTopology:
         """
@@ -60,7 +83,7 @@ class NetworkDiscoveryManager:
             
         Returns:
             NetworkTopology object containing discovered network        """
-        self.logger.info(f"Starting network discovery from seed IP: {seed_ip}")
+        self.logger.info("Starting network discovery from seed IP: %s", seed_ip)
         
         self.topology.discovery_timestamp = datetime.now()
         
@@ -73,53 +96,92 @@ class NetworkDiscoveryManager:
         return self.topology
     
     def _discover_switches_iterative(self, seed_ip: str):
-        seen_switches: Set[str] = set()
-        failed_switches: Set[str] = set()
-        candidate_switches: Set[str] = set()
-        candidate_switches.add(seed_ip)
+        """
+        Walk the LLDP graph breadth-first, discovering each level in parallel.
+        Results are merged on the calling thread, so the worker threads never
+        touch the topology or the discovered/failed sets.
+        
+        Args:
+            seed_ip: Starting IP address for discovery
+        """
+        seen_switches: Set[str] = {seed_ip}
+        frontier: Set[str] = {seed_ip}
         self.logger.debug("Start looping candidates")
         counter: int = 0
-        while candidate_switches:
-            is_ok = True
-            current_ip = candidate_switches.pop()
-            seen_switches.add(current_ip)
-            self.logger.debug(f"Looking at {current_ip}")
-            try:
-                vendor, ssh_client, credentials = self.detector.detect_switch_type(current_ip)
-                if ssh_client:
-                    ssh_client.disconnect()  # Close the detection connection
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while frontier:
+                next_frontier: Set[str] = set()
+                futures = {executor.submit(self._discover_single, ip): ip for ip in frontier}
+                for future in as_completed(futures):
+                    current_ip = futures[future]
+                    switch_info = future.result()
+                    counter += 1
+                    self.logger.debug("Looked at %d switches", counter)
+                    if switch_info is None:
+                        self.failed_switches.add(current_ip)
+                        continue
                     
-                if not credentials:
-                    self.logger.warning(f"No credentials returned for {vendor}")
-                    self.failed_switches.add(current_ip)
-                    is_ok = False
-                
-                if not vendor:
-                    self.logger.warning(f"Failed to detect vendor for {current_ip}")
-                    self.failed_switches.add(current_ip)
-                    is_ok = False
-
-                if is_ok:
-                    discovery_class = self.discovery_classes.get(vendor)
-                    switch_instance = discovery_class(
-                        host=current_ip,
-                        username=credentials['username'],
-                        password=credentials['password']
-                    )
-                    switch_info = switch_instance.get_switch_info()
                     self.topology.add_switch(switch_info)
+                    if switch_info.type not in SUPPORTED_VENDORS:
+                        self.partial_switches.add(switch_info.ip)
+                        continue
                     self.discovered_switches.add(switch_info.ip)
                     for neighbor in switch_info.neighbors:
                         neighbor_ip = neighbor.ip
+                        if not _is_valid_ip(neighbor_ip):
+                            self.logger.debug("Skipping neighbor with invalid IP %r", neighbor_ip)
+                            continue
                         if neighbor_ip not in seen_switches:
-                            candidate_switches.add(neighbor_ip)
-            except Exception as e:
-                self.logger.error(f"Discovery failed for {current_ip}: {str(e)}")
-                self.failed_switches.add(current_ip)
-            counter += 1
-            self.logger.debug(f"Looked at {counter} switches")
-        self.logger.info(f"Checked all available {counter} switches")
+                            seen_switches.add(neighbor_ip)
+                            next_frontier.add(neighbor_ip)
+                frontier = next_frontier
+        self.logger.info("Checked all available %d switches", counter)
+
+    def _discover_single(self, current_ip: str) -> Optional[SwitchInfo]:
+        """
+        Detect the vendor of one switch and collect its information.
+        Runs on a worker thread; only the thread-safe detector is shared.
+        
+        Args:
+            current_ip: IP address of the switch
+            
+        Returns:
+            SwitchInfo, or None if the switch could not be discovered
+        """
+        self.logger.debug("Looking at %s", current_ip)
+        try:
+            is_ok = True
+            vendor, ssh_client, credentials = self.detector.detect_switch_type(current_ip)
+            if ssh_client:
+                connection_pool.release(ssh_client)  # The discovery class picks the session up again
+                
+            if not credentials:
+                self.logger.warning("No credentials returned for %s", vendor)
+                is_ok = False
+            
+            if not vendor:
+                self.logger.warning("Failed to detect vendor for %s", current_ip)
+                is_ok = False
 
+            if not is_ok:
+                return None
+            
+            if vendor not in SUPPORTED_VENDORS:
+                # Keep what detection learned
+                self.logger.warning("No discovery class for %s switch at %s, recording vendor only", vendor, current_ip)
+                return SwitchInfo(ip=current_ip, mac=None, type=vendor, neighbors=[])
+            
+            switch_instance = make_discovery(
+                vendor,
+                host=current_ip,
+                username=credentials['username'],
+                password=credentials['password']
+            )
+            return switch_instance.get_switch_info()
+            
+        except Exception as e:
+            self.logger.error("Discovery failed for %s: %s", current_ip, e)
+            return None
     
     def _banner_print(self, message: str):
         self.logger.info("-" * 65)
@@ -132,45 +194,59 @@ class NetworkDiscoveryManager:
         self.logger.info("\n" + "="*60)
         self.logger.info("NETWORK DISCOVERY SUMMARY")
         self.logger.info("="*60)
-        self.logger.info(f"✅ Successfully discovered: {len(self.discovered_switches)} switches")
-        self.logger.info(f"❌ Failed to discover: {len(self.failed_switches)} switches")
-        self.logger.info(f"🕒 Discovery timestamp: {self.topology.discovery_timestamp}")
+        self.logger.info("✅ Successfully discovered: %d switches", len(self.discovered_switches))
+        self.logger.info("❌ Failed to discover: %d switches", len(self.failed_switches))
+        if self.partial_switches:
+            self.logger.info("❔ Detected without discovery support: %d switches", len(self.partial_switches))
+        self.logger.info("🕒 Discovery timestamp: %s", self.topology.discovery_timestamp)
         
+        switches = self.topology.switches
         if self.discovered_switches:
-            self.logger.info(f"\nDiscovered switches:")
+            self.logger.info("\nDiscovered switches:")
             for ip in sorted(self.discovered_switches):
-                switch = self.topology.get_switch(ip)
+                switch = switches.get(ip)
                 if switch:
-                    self.logger.info(f"   {ip} - {switch.type} ({len(switch.neighbors)} neighbors)")
+                    self.logger.info("   %s - %s (%d neighbors)", ip, switch.type, len(switch.neighbors))
+        
+        if self.partial_switches:
+            self.logger.info("\nDetected switches without discovery support:")
+            for ip in sorted(self.partial_switches):
+                self.logger.info("   %s - %s", ip, switches[ip].type)
         
         if self.failed_switches:
-            self.logger.info(f"\nFailed switches:")
+            self.logger.info("\nFailed switches:")
             for ip in sorted(self.failed_switches):
-                self.logger.info(f"   {ip}")
+                self.logger.info("   %s", ip)
         
         self.logger.info("="*60)
     
-    def save_to_file(self, filename: str, format: str = 'json') -> None:
+    def save_to_file(self, filename: str, format: str = 'json', pretty: bool = True) -> None:
         """
         Save topology to file.
         
         Args:
             filename: Output filename
             format: Output format ('json' or 'yaml')
+            pretty: Indent JSON output (compact output is smaller and faster to write)
         """
         topology_dict = self.topology.to_dict()
         
         try:
-            with open(filename, 'w') as f:
-                if format.lower() == 'yaml':
-                    yaml.dump(topology_dict, f, default_flow_style=False, indent=2)
-                else:
-                    json.dump(topology_dict, f, indent=2, default=str)
+            if format.lower() == 'yaml':
+                with open(filename, 'w') as f:
+                    yaml.dump(topology_dict, f, Dumper=_YAML_DUMPER, default_flow_style=False, indent=2)
+            elif orjson is not None:
+                with open(filename, 'wb') as f:
+                    f.write(orjson.dumps(topology_dict, option=orjson.OPT_INDENT_2 if pretty else 0))
+            else:
+                # Serialize in memory and write once; json.dump writes every token separately
+                with open(filename, 'w') as f:
+                    f.write(json.dumps(topology_dict, indent=2 if pretty else None, default=str))
             
-            self.logger.info(f"Topology saved to {filename}")
+            self.logger.info("Topology saved to %s", filename)
             
         except Exception as e:
-            self.logger.error(f"Failed to save topology: {str(e)}")
+            self.logger.error("Failed to save topology: %s", e)
     
     def get_topology_stats(self) -> Dict[str, Any]:
         """
@@ -179,22 +255,17 @@ class NetworkDiscoveryManager:
         Returns:
             Dictionary with statistics
         """
-        stats = {
+        switches = self.topology.switches.values()
+        
+        return {
             'total_switches': len(self.topology.switches),
-            'switch_types': {},
-            'total_neighbors': 0,
+            'switch_types': dict(Counter(switch.type or 'unknown' for switch in switches)),
+            'total_neighbors': sum(len(switch.neighbors) for switch in switches),
             'discovery_timestamp': self.topology.discovery_timestamp,
             'discovered_ips': list(self.discovered_switches),
-            'failed_ips': list(self.failed_switches)
+            'failed_ips': list(self.failed_switches),
+            'partial_ips': list(self.partial_switches)
         }
-        
-        # Count switch types and neighbors
-        for switch in self.topology.switches.values():
-            switch_type = switch.type or 'unknown'
-            stats['switch_types'][switch_type] = stats['switch_types'].get(switch_type, 0) + 1
-            stats['total_neighbors'] += len(switch.neighbors)
-        
-        return stats
 
 
 def main():
@@ -227,6 +298,37 @@ Examples:
         help='Output directory for results (default: output)'
     )
     
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Write the topology JSON without indentation'
+    )
+    
+    parser.add_argument(
+        '--max-workers',
+        type=int,
+        default=16,
+        help='Number of switches discovered in parallel (default: 16)'
+    )
+    
+    parser.add_argument(
+        '--sequential',
+        action='store_true',
+        help='Discover one switch at a time'
+    )
+    
+    parser.add_argument(
+        '--vendor-cache',
+        default=VENDOR_CACHE_FILE,
+        help='File remembering detected vendors between runs (default: %(default)s)'
+    )
+    
+    parser.add_argument(
+        '--no-vendor-cache',
+        action='store_true',
+        help='Probe every switch without reading or writing the vendor cache'
+    )
+    
     parser.add_argument(
         '--verbose',
         action='store_true',
@@ -241,14 +343,19 @@ Examples:
     
     logger.info("Network Switch Discovery Tool")
     logger.info("=" * 40)
-    logger.info(f"Seed IP: {args.seed_ip}")
-    logger.info(f"Credentials: {args.credentials}")
-    logger.info(f"Output Directory: {args.output_dir}")
+    logger.info("Seed IP: %s", args.seed_ip)
+    logger.info("Credentials: %s", args.credentials)
+    logger.info("Output Directory: %s", args.output_dir)
     logger.info("")
     
+    discovery_manager = None
     try:
         # Initialize discovery manager
-        discovery_manager = NetworkDiscoveryManager(args.credentials)
+        discovery_manager = NetworkDiscoveryManager(
+            args.credentials,
+            max_workers=1 if args.sequential else args.max_workers,
+            vendor_cache_file=None if args.no_vendor_cache else args.vendor_cache
+        )
         
         # Start network discovery
         topology = discovery_manager.discover_network(
@@ -262,30 +369,34 @@ Examples:
         topology_filename = f"{args.output_dir}/topology_{args.seed_ip.replace('.', '_')}.json"
         inventory_filename = f"{args.output_dir}/inventory.yaml"
         
-        discovery_manager.save_to_file(topology_filename, 'json')
+        discovery_manager.save_to_file(topology_filename, 'json', pretty=not args.compact)
         discovery_manager.save_to_file(inventory_filename, 'yaml')
         
         # Print statistics
         stats = discovery_manager.get_topology_stats()
         
         logger.info("Discovery completed successfully!")
-        logger.info(f"Results saved to:")
-        logger.info(f"  - Topology (JSON): {topology_filename}")
-        logger.info(f"  - Inventory (YAML): {inventory_filename}")
-        logger.info(f"\nDiscovery Statistics:")
-        logger.info(f"  - Total switches discovered: {stats['total_switches']}")
-        logger.info(f"  - Switch types: {stats['switch_types']}")
-        logger.info(f"  - Total neighbor connections: {stats['total_neighbors']}")
+        logger.info("Results saved to:")
+        logger.info("  - Topology (JSON): %s", topology_filename)
+        logger.info("  - Inventory (YAML): %s", inventory_filename)
+        logger.info("\nDiscovery Statistics:")
+        logger.info("  - Total switches discovered: %s", stats['total_switches'])
+        logger.info("  - Switch types: %s", stats['switch_types'])
+        logger.info("  - Total neighbor connections: %s", stats['total_neighbors'])
         
     except KeyboardInterrupt:
         logger.info("\nDiscovery interrupted by user")
         sys.exit(1)
     except Exception as e:
-        logger.error(f"Discovery failed: {e}")
+        logger.error("Discovery failed: %s", e)
         if args.verbose:
             import traceback
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        # Remember detected vendors even if discovery was interrupted
+        if discovery_manager:
+            discovery_manager.detector.save_vendor_cache()
 
 
 if __name__ == "__main__":
@@ -3,11 +3,11 @@ Minimal data structures for switch discovery information.
 Only includes essential fields: IP, MAC, vendor/type, and neighbor information.
 """
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class NeighborInfo:
     """
     Minimal LLDP neighbor information.
@@ -16,8 +16,12 @@ class NeighborInfo:
     mac: Optional[str] = None
     type: Optional[str] = None  # vendor/switch type
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert neighbor to dictionary format."""
+        return {"ip": self.ip, "mac": self.mac, "type": self.type}
+
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SwitchInfo:
     """
     Minimal switch information.
@@ -25,11 +29,20 @@ class SwitchInfo:
     ip: str
     mac: Optional[str] = None
     type: Optional[str] = None  # vendor (hirschmann, lantech, kontron, nomad)
-    neighbors: List[NeighborInfo] = None
+    neighbors: Tuple[NeighborInfo, ...] = ()
     
     def __post_init__(self):
-        if self.neighbors is None:
-            self.neighbors = []
+        # Stored as a tuple so the frozen instance is hashable and can't change under its users
+        object.__setattr__(self, 'neighbors', tuple(self.neighbors or ()))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert switch to dictionary format."""
+        return {
+            "ip": self.ip,
+            "mac": self.mac,
+            "type": self.type,
+            "neighbors": [neighbor.to_dict() for neighbor in self.neighbors]
+        }
 
 
 @dataclass
@@ -56,20 +69,5 @@ class NetworkTopology:
         """Convert topology to dictionary format."""
         return {
             "discovery_timestamp": self.discovery_timestamp.isoformat() if self.discovery_timestamp else None,
-            "switches": {
-                ip: {
-                    "ip": switch.ip,
-                    "mac": switch.mac,
-                    "type": switch.type,
-                    "neighbors": [
-                        {
-                            "ip": neighbor.ip,
-                            "mac": neighbor.mac,
-                            "type": neighbor.type
-                        }
-                        for neighbor in switch.neighbors
-                    ]
-                }
-                for ip, switch in self.switches.items()
-            }
+            "switches": {ip: switch.to_dict() for ip, switch in self.switches.items()}
         }
@@ -4,11 +4,7 @@ Focuses only on essential discovery functionality.
 """
 from abc import ABC, abstractmethod
 from typing import Dict, List, Any
-import sys
-import os
-
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import re
 
 from data_model import SwitchInfo
 
@@ -19,6 +15,15 @@ class BaseDiscovery(ABC):
     Only defines essential methods needed for network topology discovery.
     """
     
+    # Tokens found in LLDP system descriptions, mapped to the vendor they identify
+    VENDOR_TOKENS = {
+        'hirschmann': 'hirschmann', 'hios': 'hirschmann', 'bobcat': 'hirschmann',
+        'lantech': 'lantech', 'tpes': 'lantech',
+        'kontron': 'kontron', 'istax': 'kontron', 'kswitch': 'kontron',
+        'nomad': 'nomad',
+    }
+    _RX_VENDOR_TOKEN = re.compile('|'.join(VENDOR_TOKENS), re.IGNORECASE)
+    
     def __init__(self, host: str, username: str, password: str, port: int = 22):
         """Initialize the discovery instance with connection parameters."""
         self.host = host
@@ -36,6 +41,12 @@ class BaseDiscovery(ABC):
         """Close connection to the switch."""
         pass
     
+    @classmethod
+    def _classify_vendor(cls, description: str) -> str:
+        """Map an LLDP system description to a vendor name in a single scan."""
+        match = cls._RX_VENDOR_TOKEN.search(description)
+        return cls.VENDOR_TOKENS[match.group(0).lower()] if match else 'unknown'
+    
     @abstractmethod
     def get_switch_info(self) -> SwitchInfo:
         """
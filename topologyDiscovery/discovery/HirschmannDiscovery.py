@@ -3,72 +3,82 @@ Simplified Hirschmann Switch Discovery Implementation
 Focuses on essential data: vendor, IP, MAC, and neighbor info only.
 """
 import re
-import sys
-import os
 from typing import Dict, List, Any
 
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from .BaseDiscovery import BaseDiscovery
-from ssh_client import SSHClient
+from ssh_client import connection_pool
 from data_model import SwitchInfo, NeighborInfo
 from logging_config import get_logger
 
 
 class HirschmannDiscovery(BaseDiscovery):
     """Simplified discovery implementation for Hirschmann switches."""
+
+    logger = get_logger(__name__)
+
+    # Patterns are compiled once per process and shared by all instances
+    _RX_MGMT_MAC = re.compile(r"MAC address \(management\)\.+(.+)", re.IGNORECASE)
+    _RX_LLDP_SCAN = re.compile(
+        r'IPv4 Management address[^\n]*?(?P<ip>\d+\.\d+\.\d+\.\d+)'
+        r'|Chassis ID[^\n]*?(?P<mac>(?:[0-9a-fA-F]{2}[:-]){5}[0-9a-fA-F]{2})'
+        r'|System description(?P<desc>[^\n]*)'
+        r'|^[ \t]*(?P<sep>Remote data,)',
+        re.MULTILINE
+    )
+    _RX_SYSINFO_HINT = re.compile(r'System information|hirschmann', re.IGNORECASE)
     
     def __init__(self, host: str, username: str, password: str, port: int = 22):
         super().__init__(host, username, password, port)
         self.ssh_client = None
         self.vendor = "hirschmann"
-        self.logger = get_logger(__name__)
     def connect(self) -> bool:
         """Establish SSH connection to Hirschmann switch."""
         try:
-            self.ssh_client = SSHClient(
+            self.ssh_client = connection_pool.acquire(
                 host=self.host,
                 username=self.username,
                 password=self.password,
                 port=self.port
             )
             
-            if self.ssh_client.connect() and self.ssh_client.start_shell():
-                self.ssh_client.send_command_to_shell("", 1.0)  # Clear initial prompt
-                self.ssh_client.send_command_to_shell("cli numlines 0", 1.0) # disable interactive prompt
+            if self.ssh_client and self.ssh_client.start_shell():
+                self.ssh_client.learn_prompt()  # Return as soon as the prompt is back, e.g. "(BXP) #"
+                self.ssh_client.send_command_to_shell("cli numlines 0", 1.0)  # Disable the interactive pager
                 return True
             
             return False
             
         except Exception as e:
-            self.logger.error(f"Connection failed to {self.host}: {e}")
+            self.logger.error("Connection failed to %s: %s", self.host, e)
             return False
     
     def disconnect(self) -> None:
-        """Close SSH connection to the switch."""
+        """Return the SSH connection to the pool."""
         if self.ssh_client:
-            self.ssh_client.disconnect()
+            connection_pool.release(self.ssh_client)
             self.ssh_client = None
 
     def get_basic_info(self) -> Dict[str, Any]:
         """Get essential system information: vendor, IP, and MAC address."""
         try:
             output = self.ssh_client.send_command_to_shell("show system info", 3.0)
-            if output and ("System information" in output or "hirschmann" in output.lower()):
-                return self._parse_basic_info(output)
-            
-            return {"vendor": "hirschmann", "ip": self.host, "mac": None}
-            
+            return self._basic_info_from_output(output)
         except Exception:
             return {"vendor": "hirschmann", "ip": self.host, "mac": None}
     
+    def _basic_info_from_output(self, output: str) -> Dict[str, Any]:
+        """Parse 'show system info' output, falling back to defaults if it doesn't look like one."""
+        if output and self._RX_SYSINFO_HINT.search(output):
+            return self._parse_basic_info(output)
+
+        return {"vendor": "hirschmann", "ip": self.host, "mac": None}
+    
     def _parse_basic_info(self, output: str) -> Dict[str, Any]:
         """Parse essential information from system info output."""
         info = {"vendor": "hirschmann", "ip": self.host, "mac": None}
         
         # Extract MAC address
-        mac_match = re.search(r"MAC address \(management\)\.+(.+)", output, re.IGNORECASE)
+        mac_match = self._RX_MGMT_MAC.search(output)
         if mac_match:
             info["mac"] = mac_match.group(1).strip()
         
@@ -82,47 +92,19 @@ class HirschmannDiscovery(BaseDiscovery):
             return []
             
         except Exception as e:
-            self.logger.error(f"Failed to get neighbor info: {e}")
+            self.logger.error("Failed to get neighbor info: %s", e)
             return []
     def _parse_lldp_neighbors(self, output: str) -> List[NeighborInfo]:
         """Parse LLDP output and extract essential neighbor information."""
         neighbors = []
-        lines = output.split('\n')
         current_neighbor = {}
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Extract IPv4 Management address
-            if 'IPv4 Management address' in line:
-                ip_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', line)
-                if ip_match:
-                    current_neighbor['ip'] = ip_match.group(1)
-            
-            # Extract Chassis ID (MAC address)
-            elif 'Chassis ID' in line:
-                mac_match = re.search(r'([0-9a-fA-F]{2}[:-]){5}[0-9a-fA-F]{2}', line)
-                if mac_match:
-                    current_neighbor['mac'] = mac_match.group(0)
-            
-            # Determine neighbor type from System description
-            elif 'System description' in line:
-                line_lower = line.lower()
-                if 'hirschmann' in line_lower:
-                    current_neighbor['type'] = 'hirschmann'
-                elif 'lantech' in line_lower:
-                    current_neighbor['type'] = 'lantech'
-                elif 'kontron' in line_lower:
-                    current_neighbor['type'] = 'kontron'
-                elif 'nomad' in line_lower:
-                    current_neighbor['type'] = 'nomad'
-                else:
-                    current_neighbor['type'] = 'unknown'
-            
+
+        # One pass over the raw buffer; each match is dispatched by group name
+        for match in self._RX_LLDP_SCAN.finditer(output):
+            field = match.lastgroup
+
             # Process complete neighbor entry
-            elif line.startswith('Remote data,') and current_neighbor:
+            if field == 'sep':
                 if 'ip' in current_neighbor:
                     neighbors.append(NeighborInfo(
                         ip=current_neighbor.get('ip'),
@@ -130,6 +112,14 @@ class HirschmannDiscovery(BaseDiscovery):
                         type=current_neighbor.get('type', 'unknown')
                     ))
                 current_neighbor = {}
+
+            # Determine neighbor type from System description
+            elif field == 'desc':
+                current_neighbor['type'] = self._classify_vendor(match.group('desc'))
+
+            # IPv4 Management address or Chassis ID (MAC address)
+            else:
+                current_neighbor[field] = match.group(field)
         
         # Add the last neighbor if exists
         if current_neighbor and 'ip' in current_neighbor:
@@ -143,24 +133,29 @@ class HirschmannDiscovery(BaseDiscovery):
     def get_switch_info(self) -> SwitchInfo:
         """Get essential switch information for network discovery."""
         try:
-            self.logger.debug(f"Attempting to connect to {self.host} with privided user")
+            self.logger.debug("Attempting to connect to %s with username %s", self.host, self.username)
             if not self.connect():
-                self.logger.error(f"Failed to connect to {self.host}")
+                self.logger.error("Failed to connect to %s", self.host)
                 return SwitchInfo(ip=self.host, mac=None, type='hirschmann', neighbors=[])
             
-            self.logger.info(f"Successfully connected to {self.host}")
+            self.logger.info("Successfully connected to %s", self.host)
+            
+            # Fetch system info and LLDP neighbors over the same session
+            self.logger.debug("Getting system and neighbor information...")
+            system_output, lldp_output = self.ssh_client.send_commands_to_shell(
+                ["show system info", "show lldp remote-data"], 3.0
+            )
             
             # Get basic info (vendor, IP, MAC)
-            basic_info = self.get_basic_info()
-            self.logger.debug(f"System info retrieved: {list(basic_info.keys()) if basic_info else 'None'}")
+            basic_info = self._basic_info_from_output(system_output)
+            self.logger.debug("System info retrieved: %s", list(basic_info) if basic_info else None)
             
             # Get neighbor information
-            self.logger.debug("Getting neighbor information...")
-            neighbors = self.get_neighbors()
-            self.logger.info(f"Found {len(neighbors)} neighbors")
+            neighbors = self._parse_lldp_neighbors(lldp_output) if lldp_output else []
+            self.logger.info("Found %d neighbors", len(neighbors))
             
             self.disconnect()
-            self.logger.debug(f"Disconnected from {self.host}")
+            self.logger.debug("Disconnected from %s", self.host)
             
             return SwitchInfo(
                 ip=basic_info.get('ip', self.host),
@@ -170,7 +165,7 @@ class HirschmannDiscovery(BaseDiscovery):
             )
             
         except Exception as e:
-            self.logger.error(f"Failed to get switch info: {e}")
+            self.logger.error("Failed to get switch info: %s", e)
             try:
                 self.disconnect()
             except:
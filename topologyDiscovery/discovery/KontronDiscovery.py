@@ -3,74 +3,87 @@ Kontron Switch Discovery Implementation
 Focuses on essential data: vendor, IP, MAC, and neighbor info only.
 """
 import re
-import sys
-import os
 from typing import Dict, List, Any
 
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from .BaseDiscovery import BaseDiscovery
-from ssh_client import SSHClient
+from ssh_client import connection_pool
 from data_model import SwitchInfo, NeighborInfo
 from logging_config import get_logger
 
 
 class KontronDiscovery(BaseDiscovery):
     """Discovery implementation for Kontron switches."""
+
+    logger = get_logger(__name__)
+
+    # Patterns are compiled once per process and shared by all instances
+    _RX_PAGER = re.compile(rb'-- more --[^\r\n]*', re.IGNORECASE)  # The whole iStaX pager line, matched once
+    _RX_MAC_ADDRESS = re.compile(r"MAC Address\s*:\s*([0-9a-fA-F-]{17})")
+    _RX_LLDP_SCAN = re.compile(
+        r'^[ \t]*(?:'
+        r'(?P<sep>Local Interface)'
+        r'|(?=[^\n]*Management Address)(?=[^\n]*IPv4)[^\n]*?(?P<ip>\d+\.\d+\.\d+\.\d+)'
+        r'|Chassis ID[^:\n]*:[ \t]*(?P<mac>[0-9a-fA-F-]{17})[ \t\r]*$'
+        r'|System Description[^:\n]*:(?P<desc>[^\n]*)'
+        r')',
+        re.MULTILINE
+    )
     
     def __init__(self, host: str, username: str, password: str, port: int = 22):
         super().__init__(host, username, password, port)
         self.ssh_client = None
         self.vendor = "kontron"
-        self.logger = get_logger(__name__)
     
     def connect(self) -> bool:
         """Establish SSH connection to Kontron switch."""
         try:
-            self.ssh_client = SSHClient(
+            self.ssh_client = connection_pool.acquire(
                 host=self.host,
                 username=self.username,
                 password=self.password,
                 port=self.port
             )
             
-            if self.ssh_client.connect() and self.ssh_client.start_shell():
-                self.ssh_client.send_command_to_shell("", 1.0)  # Clear initial prompt
-                self.ssh_client.send_command_to_shell("terminal length 0", 1.0) # disable interactive prompt
+            if self.ssh_client and self.ssh_client.start_shell():
+                self.ssh_client.pager_pattern = self._RX_PAGER  # Page on if 'terminal length 0' is ignored
+                self.ssh_client.learn_prompt()  # Return as soon as the prompt is back
+                self.ssh_client.send_command_to_shell("terminal length 0", 1.0)  # Disable the interactive pager
                 return True
             
             return False
             
         except Exception as e:
-            self.logger.error(f"Connection failed to {self.host}: {e}")
+            self.logger.error("Connection failed to %s: %s", self.host, e)
             return False
     
     def disconnect(self) -> None:
-        """Close SSH connection to the switch."""
+        """Return the SSH connection to the pool."""
         if self.ssh_client:
-            self.ssh_client.disconnect()
+            connection_pool.release(self.ssh_client)
             self.ssh_client = None
     
     def get_basic_info(self) -> Dict[str, Any]:
         """Get essential system information: vendor, IP, and MAC address."""
         try:
-            # Send the command and handle potential pager
-            output = self._send_command_with_pager("show version", 5.0)
-            if output and ("kontron" in output.lower() or "istax" in output.lower() or "kswitch" in output.lower()):
-                return self._parse_basic_info(output)
-            
-            return {"vendor": "kontron", "ip": self.host, "mac": None}
+            output = self.ssh_client.send_command_to_shell("show version", 5.0)
+            return self._basic_info_from_output(output)
             
         except Exception:
             return {"vendor": "kontron", "ip": self.host, "mac": None}
     
+    def _basic_info_from_output(self, output: str) -> Dict[str, Any]:
+        """Parse 'show version' output, falling back to defaults if it isn't from a Kontron switch."""
+        if output and ("kontron" in output.lower() or "istax" in output.lower() or "kswitch" in output.lower()):
+            return self._parse_basic_info(output)
+        
+        return {"vendor": "kontron", "ip": self.host, "mac": None}
+    
     def _parse_basic_info(self, output: str) -> Dict[str, Any]:
         """Parse essential information from show version output."""
         info = {"vendor": "kontron", "ip": self.host, "mac": None}
         
         # Extract MAC address
-        mac_match = re.search(r"MAC Address\s*:\s*([0-9a-fA-F-]{17})", output)
+        mac_match = self._RX_MAC_ADDRESS.search(output)
         if mac_match:
             info["mac"] = mac_match.group(1).strip()
         
@@ -84,30 +97,28 @@ class KontronDiscovery(BaseDiscovery):
     def get_neighbors(self) -> List[NeighborInfo]:
         """Get neighbor information from LLDP."""
         try:
-            output = self._send_command_with_pager("show lldp neighbors", 5.0)
+            output = self.ssh_client.send_command_to_shell("show lldp neighbors", 5.0)
             if output:
                 return self._parse_lldp_neighbors(output)
             return []
             
         except Exception as e:
-            self.logger.error(f"Failed to get neighbor info: {e}")
+            self.logger.error("Failed to get neighbor info: %s", e)
             return []
     
     def _parse_lldp_neighbors(self, output: str) -> List[NeighborInfo]:
         """Parse LLDP output and extract essential neighbor information."""
         neighbors = []
-        lines = output.split('\n')
         current_neighbor = {}
         
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
+        # One pass over the raw buffer; each match is dispatched by group name
+        for match in self._RX_LLDP_SCAN.finditer(output):
+            field = match.lastgroup
             
             # Start of a new neighbor entry
-            if line.startswith('Local Interface'):
+            if field == 'sep':
                 # Process previous neighbor if exists
-                if current_neighbor and 'ip' in current_neighbor:
+                if 'ip' in current_neighbor:
                     neighbors.append(NeighborInfo(
                         ip=current_neighbor.get('ip'),
                         mac=current_neighbor.get('mac'),
@@ -115,36 +126,13 @@ class KontronDiscovery(BaseDiscovery):
                     ))
                 current_neighbor = {}
             
-            # Extract Management Address (IPv4)
-            elif 'Management Address' in line and 'IPv4' in line:
-                ip_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', line)
-                if ip_match:
-                    current_neighbor['ip'] = ip_match.group(1)
-            
-            # Extract Chassis ID (MAC address)
-            elif line.startswith('Chassis ID'):
-                parts = line.split(':')
-                if len(parts) > 1:
-                    chassis_id = parts[1].strip()
-                    # Check if it's a MAC address format
-                    if re.match(r'^[0-9a-fA-F-]{17}$', chassis_id):
-                        current_neighbor['mac'] = chassis_id
-            
             # Determine neighbor type from System Description
-            elif line.startswith('System Description'):
-                parts = line.split(':')
-                if len(parts) > 1:
-                    description = parts[1].strip().lower()
-                    if 'hirschmann' in description or 'hios' in description or 'bobcat' in description:
-                        current_neighbor['type'] = 'hirschmann'
-                    elif 'lantech' in description or 'tpes' in description:
-                        current_neighbor['type'] = 'lantech'
-                    elif 'kontron' in description or 'istax' in description or 'kswitch' in description:
-                        current_neighbor['type'] = 'kontron'
-                    elif 'nomad' in description:
-                        current_neighbor['type'] = 'nomad'
-                    else:
-                        current_neighbor['type'] = 'unknown'
+            elif field == 'desc':
+                current_neighbor['type'] = self._classify_vendor(match.group('desc'))
+            
+            # Management Address (IPv4) or MAC-formatted Chassis ID
+            else:
+                current_neighbor[field] = match.group(field)
         
         # Add the last neighbor if exists
         if current_neighbor and 'ip' in current_neighbor:
@@ -159,24 +147,26 @@ class KontronDiscovery(BaseDiscovery):
     def get_switch_info(self) -> SwitchInfo:
         """Get essential switch information for network discovery."""
         try:
-            self.logger.info(f"Attempting to connect to {self.host} with provided user")
+            self.logger.debug("Attempting to connect to %s with provided user", self.host)
             if not self.connect():
-                self.logger.error(f"Failed to connect to {self.host}")
+                self.logger.error("Failed to connect to %s", self.host)
                 return SwitchInfo(ip=self.host, mac=None, type='kontron', neighbors=[])
             
-            self.logger.info(f"Successfully connected to {self.host}")
+            self.logger.info("Successfully connected to %s", self.host)
             
-            # Get basic info (vendor, IP, MAC)
-            basic_info = self.get_basic_info()
-            self.logger.info(f"System info retrieved: {list(basic_info.keys()) if basic_info else 'None'}")
+            # Fetch version and LLDP neighbors over the same session
+            self.logger.debug("Getting system and neighbor information...")
+            version_output, lldp_output = self.ssh_client.send_commands_to_shell(
+                ["show version", "show lldp neighbors"], 5.0
+            )
+            basic_info = self._basic_info_from_output(version_output)
+            neighbors = self._parse_lldp_neighbors(lldp_output) if lldp_output else []
             
-            # Get neighbor information
-            self.logger.info("Getting neighbor information...")
-            neighbors = self.get_neighbors()
-            self.logger.info(f"Found {len(neighbors)} neighbors")
+            self.logger.debug("System info retrieved: %s", list(basic_info) if basic_info else None)
+            self.logger.info("Found %d neighbors", len(neighbors))
             
             self.disconnect()
-            self.logger.info(f"Disconnected from {self.host}")
+            self.logger.debug("Disconnected from %s", self.host)
             
             return SwitchInfo(
                 ip=basic_info.get('ip', self.host),
@@ -186,45 +176,13 @@ class KontronDiscovery(BaseDiscovery):
             )
             
         except Exception as e:
-            self.logger.error(f"Failed to get switch info: {e}")
+            self.logger.error("Failed to get switch info: %s", e)
             try:
                 self.disconnect()
             except:
                 pass
             return SwitchInfo(ip=self.host, mac=None, type='kontron', neighbors=[])
     
-    def _send_command_with_pager(self, command: str, timeout: float) -> str:
-        """
-        Send command and handle potential pager (more/less) interaction.
-        Kontron switches use pager for long outputs like 'show version'.
-        """
-        try:
-            # Send the initial command
-            output = self.ssh_client.send_command_to_shell(command, timeout)
-            
-            # Check if there's a pager prompt (-- more --)
-            if output and ("-- more --" in output.lower() or "next page: space" in output.lower()):
-                full_output = output
-                
-                # Keep sending spaces to get more content until no more pager prompts
-                max_pages = 10  # Safety limit to avoid infinite loops
-                page_count = 0
-                
-                while ("-- more --" in full_output.lower() or "next page: space" in full_output.lower()) and page_count < max_pages:
-                    # Send space to continue
-                    additional_output = self.ssh_client.send_command_to_shell(" ", timeout)
-                    if additional_output:
-                        full_output += "\n" + additional_output
-                    page_count += 1
-                
-                return full_output
-            
-            return output
-            
-        except Exception as e:
-            self.logger.error(f"Error sending command with pager handling: {e}")
-            return ""
-    
     # Compatibility methods required by BaseDiscovery
     def get_system_info(self) -> Dict[str, Any]:
         """Get basic system information (backward compatibility)."""
@@ -2,52 +2,50 @@
 Lantech Switch Discovery Implementation
 """
 import re
-import sys
-import os
 from typing import Dict, List, Any
 
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from .BaseDiscovery import BaseDiscovery
-from ssh_client import SSHClient
+from ssh_client import connection_pool
 from data_model import SwitchInfo, NeighborInfo
 from logging_config import get_logger
 
 
 class LantechDiscovery(BaseDiscovery):
     """Stub implementation for Lantech switches."""
+
+    logger = get_logger(__name__)
     
     def __init__(self, host: str, username: str, password: str, port: int = 22):
         super().__init__(host, username, password, port)
         self.ssh_client = None
         self.vendor = "lantech"
-        self.logger = get_logger(__name__)
     
     def connect(self) -> bool:
         """Establish SSH connection to Lantech switch."""
         try:
-            self.ssh_client = SSHClient(
+            self.ssh_client = connection_pool.acquire(
                 host=self.host,
                 username=self.username,
                 password=self.password,
                 port=self.port
             )
             
-            if self.ssh_client.connect() and self.ssh_client.start_shell():
-                self.ssh_client.send_command_to_shell("", 1.0)  # Clear initial prompt
-                self.ssh_client.send_command_to_shell("cli numlines 0", 1.0) # disable interactive prompt
+            if self.ssh_client and self.ssh_client.start_shell():
+                # Clear the initial prompt, then disable the interactive pager
+                self.ssh_client.send_commands_to_shell(["", "cli numlines 0"], 1.0)
                 return True
             
             return False
             
         except Exception as e:
-            self.logger.error(f"Connection failed to {self.host}: {e}")
+            self.logger.error("Connection failed to %s: %s", self.host, e)
             return False
     
     def disconnect(self) -> None:
-        """TODO: Implement Lantech disconnect logic."""
-        pass
+        """Return the SSH connection to the pool."""
+        if self.ssh_client:
+            connection_pool.release(self.ssh_client)
+            self.ssh_client = None
     
     def get_switch_info(self) -> SwitchInfo:
         """Get simplified switch information for network discovery."""
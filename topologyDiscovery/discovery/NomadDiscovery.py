@@ -2,61 +2,62 @@
 Nomad Switch Discovery Implementation
 """
 import re
-import sys
-import os
 from typing import Dict, List, Any
 
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from .BaseDiscovery import BaseDiscovery
-from ssh_client import SSHClient
+from ssh_client import connection_pool
 from data_model import SwitchInfo, NeighborInfo
 from logging_config import get_logger
 
 
 class NomadDiscovery(BaseDiscovery):
     """Nomad switch discovery implementation."""
+
+    logger = get_logger(__name__)
+
+    # Patterns are compiled once per process and shared by all instances
+    _RX_MAC_ADDRESS = re.compile(r"^[ \t]*MAC[ _]address\.+([^\r\n]+)", re.IGNORECASE | re.MULTILINE)
     
     def __init__(self, host: str, username: str, password: str, port: int = 22):
         super().__init__(host, username, password, port)
         self.ssh_client = None
         self.vendor = "nomad"
-        self.logger = get_logger(__name__)  # Initialize logger
     
     def connect(self) -> bool:
         """Establish SSH connection to Nomad switch."""
         try:
-            self.ssh_client = SSHClient(
+            self.ssh_client = connection_pool.acquire(
                 host=self.host,
                 username=self.username,
                 password=self.password,
                 port=self.port
             )
             
-            if self.ssh_client.connect() and self.ssh_client.start_shell():
-                self.ssh_client.send_command_to_shell("", 1.0)  # Clear initial prompt
-                self.ssh_client.send_command_to_shell("terminal length 0", 1.0) # disable interactive prompt
+            if self.ssh_client and self.ssh_client.start_shell():
+                self.ssh_client.learn_prompt()  # Return as soon as the prompt is back
+                self.ssh_client.send_command_to_shell("terminal length 0", 1.0)  # Disable the interactive pager
                 return True
             
             return False
             
         except Exception as e:
-            self.logger.error(f"Connection failed to {self.host}: {e}")
+            self.logger.error("Connection failed to %s: %s", self.host, e)
             return False
     
     def disconnect(self) -> None:
-        """Close SSH connection to the switch."""
+        """Return the SSH connection to the pool."""
         if self.ssh_client:
-            self.ssh_client.disconnect()
+            connection_pool.release(self.ssh_client)
             self.ssh_client = None
     
     def get_basic_info(self) -> Dict[str, Any]:
         """Get essential system information: vendor, IP, and MAC address."""
         try:
             output = self.ssh_client.send_command_to_shell("show version", 3.0)
-            if output and ("lantech" in output or "tpes" in output.lower()):
-                return self._parse_basic_info(output)
+            if output:
+                folded = output.casefold()
+                if "lantech" in folded or "tpes" in folded:
+                    return self._parse_basic_info(output)
             
             return {"vendor": "lantech", "ip": self.host, "mac": None}
             
@@ -68,7 +69,7 @@ class NomadDiscovery(BaseDiscovery):
         info = {"vendor": "lantech", "ip": self.host, "mac": None}
         
         # Extract MAC address
-        mac_match = re.search(r"MAC address\.+(.+)", output, re.IGNORECASE)
+        mac_match = self._RX_MAC_ADDRESS.search(output)
         if mac_match:
             info["mac"] = mac_match.group(1).strip()
         
@@ -83,45 +84,34 @@ class NomadDiscovery(BaseDiscovery):
             return []
             
         except Exception as e:
-            print(f"Failed to get neighbor info: {e}")
+            self.logger.error("Failed to get neighbor info: %s", e)
             return []
         
     def _parse_lldp_neighbors(self, output: str) -> List[NeighborInfo]:
         """Parse LLDP output and extract essential neighbor information."""
         neighbors = []
-        lines = output.split('\n')
         current_neighbor = {}
         
-        for line in lines:
+        for line in output.splitlines():
             line = line.strip()
             if not line:
                 continue
             
             # Extract IPv4 Management address
             if 'IPv4 Management address' in line:
-                ip_match = re.search(r'Management Address\s+:\s+([\d\.]+)', line)
-                if ip_match:
-                    current_neighbor['ip'] = ip_match.group(1)
+                ip = self._field_value(line)
+                if ip and not ip.strip('0123456789.'):
+                    current_neighbor['ip'] = ip
             
             # Extract Chassis ID (MAC address)
             elif 'Chassis ID' in line:
-                mac_match = re.search(r'Chassis ID\s+:\s+([0-9A-Fa-f:-]+)', line)
-                if mac_match:
-                    current_neighbor['mac'] = mac_match.group(0)
+                mac = self._field_value(line)
+                if mac and not mac.strip('0123456789abcdefABCDEF:-'):
+                    current_neighbor['mac'] = mac
             
             # Determine neighbor type from System description
             elif 'System description' in line:
-                line_lower = line.lower()
-                if 'hirschmann' in line_lower:
-                    current_neighbor['type'] = 'hirschmann'
-                elif 'lantech' in line_lower:
-                    current_neighbor['type'] = 'lantech'
-                elif 'kontron' in line_lower:
-                    current_neighbor['type'] = 'kontron'
-                elif 'nomad' in line_lower:
-                    current_neighbor['type'] = 'nomad'
-                else:
-                    current_neighbor['type'] = 'unknown'
+                current_neighbor['type'] = self._classify_vendor(line)
             
             # Process complete neighbor entry
             elif line.startswith('PoE Priority') and current_neighbor:
@@ -143,27 +133,33 @@ class NomadDiscovery(BaseDiscovery):
         
         return neighbors
     
+    @staticmethod
+    def _field_value(line: str) -> str:
+        """Return the first word after the ':' of a 'Key : value' line."""
+        value = line.partition(':')[2].split(None, 1)
+        return value[0] if value else ''
+    
     def get_switch_info(self) -> SwitchInfo:
         """Get essential switch information for network discovery."""
         try:
-            self.logger.debug(f"Attempting to connect to {self.host} with username: {self.username}")
+            self.logger.debug("Attempting to connect to %s with username: %s", self.host, self.username)
             if not self.connect():
-                self.logger.error(f"Failed to connect to {self.host}")
+                self.logger.error("Failed to connect to %s", self.host)
                 return SwitchInfo(ip=self.host, mac=None, type='nomad', neighbors=[])
             
-            self.logger.info(f"Successfully connected to {self.host}")
+            self.logger.info("Successfully connected to %s", self.host)
             
             # Get basic info (vendor, IP, MAC)
             basic_info = self.get_basic_info()
-            self.logger.debug(f"System info retrieved: {list(basic_info.keys()) if basic_info else 'None'}")
+            self.logger.debug("System info retrieved: %s", list(basic_info) if basic_info else None)
             
             # Get neighbor information
             self.logger.debug("Getting neighbor information...")
             neighbors = self.get_neighbors()
-            self.logger.info(f"Found {len(neighbors)} neighbors")
+            self.logger.info("Found %d neighbors", len(neighbors))
             
             self.disconnect()
-            self.logger.debug(f"Disconnected from {self.host}")
+            self.logger.debug("Disconnected from %s", self.host)
             
             return SwitchInfo(
                 ip=basic_info.get('ip', self.host),
@@ -173,7 +169,7 @@ class NomadDiscovery(BaseDiscovery):
             )
             
         except Exception as e:
-            self.logger.error(f"Failed to get switch info: {e}")
+            self.logger.error("Failed to get switch info: %s", e)
             try:
                 self.disconnect()
             except:
@@ -9,6 +9,26 @@ __all__ = [
     'BaseDiscovery',
     'HirschmannDiscovery', 
     'LantechDiscovery',
-    'KontorDiscovery',
-    'NomadDiscovery'
+    'KontronDiscovery',
+    'NomadDiscovery',
+    'make_discovery',
+    'SUPPORTED_VENDORS'
 ]
+
+# Vendor key (as returned by SwitchDetector / BaseDiscovery._classify_vendor) to discovery class
+_VENDOR_DISCOVERY = {
+    'hirschmann': HirschmannDiscovery,
+    'kontron': KontronDiscovery,
+    'lantech': LantechDiscovery,
+    'nomad': NomadDiscovery
+}
+SUPPORTED_VENDORS = frozenset(_VENDOR_DISCOVERY)
+
+
+def make_discovery(vendor: str, *args, **kwargs) -> BaseDiscovery:
+    """Create the discovery instance for a vendor key."""
+    try:
+        discovery_class = _VENDOR_DISCOVERY[vendor]
+    except KeyError:
+        raise ValueError(f"Unsupported vendor: {vendor}") from None
+    return discovery_class(*args, **kwargs)
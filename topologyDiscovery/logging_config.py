@@ -1,14 +1,22 @@
 """
 Logging configuration for the topology discovery system.
 """
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from typing import Optional
 
+# Writes queued records to the real handlers on a background thread
+_listener: Optional[logging.handlers.QueueListener] = None
+
 
 def setup_logging(level: str = "INFO", log_file: Optional[str] = None) -> logging.Logger:
     """
     Set up logging configuration for the topology discovery system.
+    Discovery worker threads only enqueue records; a single listener thread
+    writes them to the console and log file.
     
     Args:
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
@@ -17,12 +25,17 @@ def setup_logging(level: str = "INFO", log_file: Optional[str] = None) -> loggin
     Returns:
         Configured logger instance
     """
+    global _listener
+    
     # Create logger
     logger = logging.getLogger("topology_discovery")
     logger.setLevel(getattr(logging, level.upper()))
     
     # Clear any existing handlers
     logger.handlers.clear()
+    if _listener:
+        _listener.stop()
+    handlers = []
     
     # Create formatter
     formatter = logging.Formatter(
@@ -34,18 +47,30 @@ def setup_logging(level: str = "INFO", log_file: Optional[str] = None) -> loggin
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(getattr(logging, level.upper()))
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers.append(console_handler)
     
     # File handler (if specified)
     if log_file:
         file_handler = logging.FileHandler(log_file)
         file_handler.setLevel(logging.DEBUG)  # File gets all debug messages
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
     
     return logger
 
 
+@atexit.register
+def _stop_listener() -> None:
+    """Flush queued records before the interpreter exits."""
+    if _listener:
+        _listener.stop()
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger instance with the specified name.
@@ -2,10 +2,13 @@
 SSH utility using pexpect for connecting to network switches.
 Based on the working ssh_command.py implementation.
 """
+import atexit
 import pexpect
+import random
+import threading
 import time
 import re
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, List
 from logging_config import get_logger
 
 
@@ -15,6 +18,30 @@ class SSHClient:
     Optimized for interactive switch sessions with prompts and paging.
     """
     
+    # Patterns are compiled once per process and shared by all instances
+    _RX_LOGIN_PROMPTS = [
+        re.compile(rb'password:'),
+        re.compile(rb'Password:'),
+        re.compile(rb'yes/no'),
+        pexpect.TIMEOUT,
+        pexpect.EOF
+    ]
+    _RX_LOGIN_RESULT = [
+        re.compile(rb'(?i)incorrect|denied|password:'),  # 0: Password rejected or asked again
+        re.compile(rb'!.*>'),  # e.g. "!(switch)>"
+        re.compile(rb'.*>'),
+        re.compile(rb'.*#'),
+        re.compile(rb'.*\$'),
+        pexpect.TIMEOUT
+    ]
+    _RX_UNREACHABLE = re.compile(rb'Connection refused|No route to host|Could not resolve hostname')
+    _RX_IDLE_TAIL = re.compile(rb'[#>$][ \t]*\Z|-- more --|next page: space', re.IGNORECASE)  # Prompt or pager, not yet followed by a newline
+    _RX_PENDING = [re.compile(rb'[\s\S]+'), pexpect.TIMEOUT]  # Everything buffered so far
+    _RX_PROMPT_LINE = re.compile(r'(.+?)\s*(?:\([^()]*\))?\s*[#>$]')  # Hostname, optional mode, prompt char
+    
+    DEFAULT_PAGER_PATTERN = '--More--'  # Pager prompt answered until a vendor sets its own
+    ALIVE_CHECK_INTERVAL = 0.1  # Seconds an isalive() result is reused by is_connected_check
+    
     def __init__(self, host: str, username: str, password: str, port: int = 22, timeout: int = 30):
         """
         Initialize SSH client.
@@ -33,6 +60,12 @@ class SSHClient:
         self.timeout = timeout
         self.session = None
         self.is_connected = False
+        self.prompt_pattern: Optional[re.Pattern] = None  # Set by the vendor to end reads on the prompt
+        self.pager_pattern: Any = self.DEFAULT_PAGER_PATTERN  # Pager prompt answered with a space while reading
+        self._alive = False
+        self._alive_checked_at = 0.0  # Monotonic time of the last isalive() call
+        self._prompt_latency = 0.5  # Moving average of seconds until the prompt returns
+        self.failure: Optional[str] = None  # Why connect() last failed: 'timeout', 'refused', 'closed' or 'auth'
         self.logger = get_logger(__name__)
     
     def connect(self) -> bool:
@@ -42,50 +75,63 @@ class SSHClient:
         Returns:
             bool: True if connection successful, False otherwise
         """
+        self.failure = None
         try:
-            self.logger.debug(f"Connecting to {self.host}...")
+            self.logger.debug("Connecting to %s...", self.host)
             
-            # Connect via SSH with explicit options
-            ssh_cmd = f'ssh -o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null -p {self.port} {self.username}@{self.host}'
-            self.session = pexpect.spawn(ssh_cmd)
+            # Connect via SSH with explicit options; keepalives hold pooled sessions open between uses
+            # Arguments are passed as a list so pexpect execs ssh without re-splitting a command line
+            ssh_args = [
+                '-o', 'StrictHostKeyChecking=no', '-o', 'UserKnownHostsFile=/dev/null',
+                '-o', 'ServerAliveInterval=30', '-o', 'ServerAliveCountMax=3',
+                '-o', 'Compression=yes',  # Table output is highly repetitive; falls back to none if refused
+                '-p', str(self.port), f'{self.username}@{self.host}'
+            ]
+            self.session = pexpect.spawn('ssh', args=ssh_args)
             self.session.timeout = self.timeout
             
             # Handle SSH connection prompts
             self.logger.debug("Waiting for password prompt...")
-            i = self.session.expect(['password:', 'Password:', 'yes/no', pexpect.TIMEOUT, pexpect.EOF])
+            i = self.session.expect_list(self._RX_LOGIN_PROMPTS)
             
             if i == 2:  # Handle "yes/no" prompt for first connection
                 self.logger.debug("Accepting host key...")
                 self.session.sendline('yes')
-                self.session.expect(['password:', 'Password:'])
-            elif i == 3:  # Timeout
+                i = self.session.expect_list(self._RX_LOGIN_PROMPTS)
+            
+            if i == 3:  # Timeout
                 self.logger.debug("Connection timeout waiting for password prompt")
+                self.failure = 'timeout'
                 return False
             elif i == 4:  # EOF
                 self.logger.debug("Connection closed unexpectedly")
+                # A refused or unroutable host stays that way; anything else may be a transient drop
+                self.failure = 'refused' if self._RX_UNREACHABLE.search(self.session.before) else 'closed'
                 return False
                 
             # Send password
             self.logger.debug("Sending password...")
             self.session.sendline(self.password)
             
-            # Wait for the initial system information and prompt
+            # Wait for the command prompt, returning as soon as it shows up
             self.logger.debug("Waiting for login to complete...")
-            time.sleep(1)  # Give it time to show system info
+            i = self.session.expect_list(self._RX_LOGIN_RESULT, timeout=10)
             
-            # Now wait for the actual command prompt
-            try:
-                self.session.expect([r'!.*>', r'.*>', r'.*#', r'.*\$', pexpect.TIMEOUT], timeout=10)
-                self.logger.debug("Found command prompt")
-                self.is_connected = True
-                return True
-            except pexpect.TIMEOUT:
+            if i == 0:  # Authentication failed
+                self.logger.debug("Login rejected for %s@%s", self.username, self.host)
+                self.failure = 'auth'
+                self.disconnect()
+                return False
+            elif i == len(self._RX_LOGIN_RESULT) - 1:  # Timeout
                 self.logger.debug("Timeout waiting for command prompt, but continuing...")
-                self.is_connected = True
-                return True
+            else:
+                self.logger.debug("Found command prompt")
+            
+            self.is_connected = True
+            return True
                 
         except Exception as e:
-            self.logger.error(f"SSH connection failed: {e}")
+            self.logger.error("SSH connection failed: %s", e)
             return False
     
     def disconnect(self) -> None:
@@ -97,6 +143,7 @@ class SSHClient:
                 pass
             self.session = None
             self.is_connected = False
+        self._alive_checked_at = 0.0
     
     def execute_command(self, command: str, timeout: int = 5) -> Dict[str, Any]:
         """
@@ -130,6 +177,40 @@ class SSHClient:
                 'error': str(e)
             }
     
+    def learn_prompt(self, wait_time: float = 1.0) -> bool:
+        """
+        Send an empty command and end later reads on the prompt that comes back.
+        The prompt is matched by the hostname it starts with, so it still matches
+        after the CLI changes mode (e.g. "switch>" to "switch(config)#"), but not
+        on output lines that merely end in '#' or '>'.
+        
+        Args:
+            wait_time: Time to wait for the prompt
+            
+        Returns:
+            bool: True if a prompt was learnt; otherwise reads keep ending on the idle timeout
+        """
+        self.prompt_pattern = None
+        if not self.is_connected or not self.session:
+            return False
+        
+        try:
+            self.session.sendline('')
+            lines = self._collect_lines(wait_time, '')
+        except Exception as e:
+            self.logger.debug("Failed to read the prompt: %s", e)
+            return False
+        
+        match = self._RX_PROMPT_LINE.fullmatch(lines[-1]) if lines else None
+        if not match:
+            self.logger.debug("No prompt found, reading until the output goes quiet")
+            return False
+        
+        hostname = re.escape(match.group(1).encode('utf-8'))
+        self.prompt_pattern = re.compile(rb'(?:^|[\r\n])[ \t]*' + hostname + rb'(?:[ \t]*\([^()\r\n]*\))?\s*[#>$]\s*$')
+        self.logger.debug("Learnt prompt %r", lines[-1])
+        return True
+    
     def send_command_to_shell(self, command: str, wait_time: float = 1.0) -> str:
         """
         Send command to interactive shell and return output.
@@ -145,69 +226,220 @@ class SSHClient:
         if not self.is_connected or not self.session:
             return ""
         
+        cached = command_cache.get(self, command)
+        if cached is not None:
+            self.logger.debug("Using cached output for: %s", command)
+            return cached
+        
         try:
-            self.logger.debug(f"Sending command: {command}")
+            self.logger.debug("Sending command: %s", command)
             
             # Send the command
             self.session.sendline(command)
             
-            # Collect the command output
-            output_lines = []
-            start_time = time.time()
-            max_wait = max(wait_time * 10, 10)  # At least 10 seconds for long outputs
-            
-            while time.time() - start_time < max_wait:
-                try:
-                    # Look for different patterns
-                    i = self.session.expect([
-                        '\r\n',           # 0: Regular line
-                        '--More--',       # 1: More prompt
-                        pexpect.TIMEOUT   # 6: Timeout
-                    ], timeout=1)
-                    
-                    if i == 0:  # Regular line
-                        line = self.session.before.decode('utf-8', errors='ignore').strip()
-                        if line and line != command and not line.startswith(command):
-                            output_lines.append(line)
-                            self.logger.debug(f"Got line: {line[:80]}...")  # Show first 80 chars
-                            
-                    elif i == 1:  # More prompt
-                        self.logger.debug("Detected 'More' prompt, sending space...")
-                        self.session.send(' ')
-                        
-                    elif i in [2, 3, 4, 5]:  # Back to command prompt
-                        self.logger.debug("Back at command prompt, command completed")
-                        # Get any remaining output
-                        remaining = self.session.before.decode('utf-8', errors='ignore').strip()
-                        if remaining and remaining != command and not remaining.startswith(command):
-                            output_lines.append(remaining)
-                        break
-                        
-                    elif i == 6:  # Timeout
-                        # Check if we have accumulated enough output
-                        if output_lines:
-                            self.logger.debug("Timeout but got output, continuing...")
-                            continue
-                        else:
-                            self.logger.debug("Timeout with no output")
-                            break
-                            
-                except pexpect.EOF:
-                    self.logger.debug("Connection closed during command execution")
-                    break
-                except Exception as e:
-                    self.logger.debug(f"Exception during command execution: {e}")
+            output_lines = self._collect_lines(wait_time, command)
+            
+            # The echoed command comes once, ahead of the output; drop just that line
+            for index, line in enumerate(output_lines):
+                if self._is_echo(line, command):
+                    del output_lines[index]
                     break
             
             # Join all output lines
             full_output = '\n'.join(output_lines)
-            self.logger.debug(f"Command completed, got {len(full_output)} characters of output")
+            self.logger.debug("Command completed, got %d characters of output", len(full_output))
+            command_cache.put(self, command, full_output)
             return full_output
             
         except Exception as e:
-            self.logger.error(f"Failed to execute command '{command}': {e}")
+            self.logger.error("Failed to execute command '%s': %s", command, e)
             return ""
     
+    def send_commands_to_shell(self, commands: List[str], wait_time: float = 1.0) -> List[str]:
+        """
+        Send several commands over the same session and return the output of each.
+        Every command is read back to the prompt before the next one is written:
+        commands typed ahead would land in a pager that is still on, and a pty that
+        echoes typeahead early leaves no reliable boundary between the outputs.
+        
+        Args:
+            commands: Commands to send, in order
+            wait_time: Time to wait for each command's completion
+            
+        Returns:
+            List[str]: Output of each command, in the same order as commands
+        """
+        if not self.is_connected or not self.session:
+            return [""] * len(commands)
+        
+        return [self.send_command_to_shell(command, wait_time) for command in commands]
+    
+    def _collect_lines(self, wait_time: float, last_command: str) -> List[str]:
+        """
+        Read shell output until the command has completed.
+        With a prompt_pattern set, the output is read in one piece up to the prompt
+        that follows the echo of last_command; otherwise it is read in raw chunks
+        until the session has been quiet for a second, or briefly once the output
+        stops at something that looks like a prompt.
+        
+        Args:
+            wait_time: Time to wait for command completion
+            last_command: Last command sent, whose echo must be seen before the prompt counts
+            
+        Returns:
+            List[str]: Stripped, non-empty output lines including command echoes
+        """
+        if self.prompt_pattern is not None:
+            return self._collect_until_prompt(wait_time, last_command)
+        
+        # Start from anything an earlier expect already read past its match
+        output = bytearray(self._take_pending())
+        scanned = 0
+        start_time = time.time()
+        max_wait = max(wait_time * 10, 10)  # At least 10 seconds for long outputs
+        
+        # A literal pager prompt is found with bytes.find; only a compiled pattern needs the regex engine
+        pager = self.pager_pattern
+        needle = pager.encode() if isinstance(pager, str) else None
+        
+        # The echo is always terminated by the newline that submitted the command
+        echo = re.compile(re.escape(last_command.strip().encode('utf-8')) + rb'[ \t\r]*\n')
+        echo_end = -1
+        
+        while time.time() - start_time < max_wait:
+            # Only rescan the tail a pager prompt split across reads could start in
+            start = max(0, scanned - 32)
+            if needle is not None:
+                begin = output.find(needle, start)
+                end = begin + len(needle)
+            else:
+                match = pager.search(output, start)
+                begin, end = match.span() if match else (-1, -1)
+            
+            if begin != -1:
+                self.logger.debug("Detected 'More' prompt, sending space...")
+                self.session.send(' ')
+                del output[begin:end]
+            scanned = len(output)
+            
+            # Once the echo is back, output ending in something prompt-like only gets a short grace period
+            if echo_end < 0:
+                match = echo.search(output)
+                echo_end = match.end() if match else -1
+            idle = 1.0
+            if echo_end >= 0 and begin == -1 and self._RX_IDLE_TAIL.search(output, max(echo_end, len(output) - 256)):
+                idle = 0.1
+            
+            try:
+                output += self.session.read_nonblocking(65536, timeout=idle)
+            except pexpect.TIMEOUT:
+                self.logger.debug("No more output, command completed")
+                break
+            except pexpect.EOF:
+                self.logger.debug("Connection closed during command execution")
+                self._alive_checked_at = 0.0
+                break
+            except Exception as e:
+                self.logger.debug("Exception during command execution: %s", e)
+                break
+        
+        return self._split_output(output)
+    
+    def _collect_until_prompt(self, wait_time: float, last_command: str) -> List[str]:
+        """
+        Read everything up to the command prompt in as few expect calls as possible.
+        Each call returns all output before the next prompt or pager prompt at once;
+        reading ends at the first prompt after the echo of last_command.
+        
+        Args:
+            wait_time: Time to wait for command completion
+            last_command: Last command sent, whose echo must be seen before the prompt counts
+            
+        Returns:
+            List[str]: Stripped, non-empty output lines including command echoes
+        """
+        output = bytearray()
+        start_time = time.time()
+        deadline = start_time + max(wait_time * 10, 10)  # At least 10 seconds for long outputs
+        # Give up once nothing has arrived for this long, learnt from how fast the prompt usually returns
+        idle_limit = max(wait_time, 4 * self._prompt_latency)
+        buffered = 0
+        
+        # Compiled once per read rather than on every expect call
+        patterns = self.session.compile_pattern_list([
+            self.prompt_pattern,  # 0: Command prompt
+            self.pager_pattern,   # 1: More prompt
+            pexpect.TIMEOUT,      # 2: Timeout
+            pexpect.EOF           # 3: Connection closed
+        ])
+        # The echo is always terminated by the newline that submitted the command
+        echo = re.compile(re.escape(last_command.strip().encode('utf-8')) + rb'[ \t\r]*\n')
+        echo_seen = False
+        
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                self.logger.debug("Timeout waiting for command prompt")
+                break
+            
+            i = self.session.expect_list(patterns, timeout=min(idle_limit, remaining))
+            
+            if i == 2:  # Timeout; keep waiting only while output is still arriving
+                if len(self.session.buffer) > buffered:
+                    buffered = len(self.session.buffer)
+                    continue
+                self.logger.debug("No output for %.1fs, giving up on the command prompt", idle_limit)
+                break
+            
+            buffered = 0
+            echo_seen = echo_seen or echo.search(self.session.before) is not None
+            output += self.session.before
+            output += b'\n'
+            
+            if i == 0:  # Command prompt
+                if echo_seen:
+                    self.logger.debug("Back at command prompt, command completed")
+                    self._prompt_latency = 0.2 * (time.time() - start_time) + 0.8 * self._prompt_latency
+                    return self._split_output(output)
+                
+            elif i == 1:  # More prompt
+                self.logger.debug("Detected 'More' prompt, sending space...")
+                self.session.send(' ')
+                
+            else:  # EOF
+                self.logger.debug("Connection closed during command execution")
+                self._alive_checked_at = 0.0
+                return self._split_output(output)
+        
+        # Keep whatever arrived without a prompt, so the next command starts from a clean buffer
+        output += self._take_pending()
+        return self._split_output(output)
+    
+    def _take_pending(self) -> bytes:
+        """Consume and return output pexpect has already read but no expect has matched."""
+        if self.session.expect_list(self._RX_PENDING, timeout=0) == 0:
+            return self.session.after
+        return b''
+    
+    @staticmethod
+    def _is_echo(line: str, command: str) -> bool:
+        """
+        Check whether an output line is the echo of a command: the command alone,
+        or the command behind a prompt such as "switch#". A blank command (e.g. the
+        space that turns a pager page) has no echo line.
+        """
+        echo = command.strip()
+        if not echo or not line.endswith(echo):
+            return False
+        prefix = line[:-len(echo)].rstrip()
+        return not prefix or prefix[-1] in '#>$'
+    
+    @staticmethod
+    def _split_output(output: bytearray) -> List[str]:
+        """Decode raw shell output into stripped, non-empty lines."""
+        lines = output.decode('utf-8', errors='ignore').splitlines()
+        return [line for line in map(str.strip, lines) if line]
+    
     def start_shell(self) -> bool:
         """
         Start shell (compatibility method - pexpect is already shell-based).
@@ -224,4 +456,178 @@ class SSHClient:
         Returns:
             bool: True if connected, False otherwise
         """
-        return self.is_connected and self.session and self.session.isalive()
+        if not self.is_connected or not self.session:
+            return False
+        
+        # isalive() is a waitpid() syscall; the pool asks on every acquire and release
+        now = time.monotonic()
+        if now - self._alive_checked_at >= self.ALIVE_CHECK_INTERVAL:
+            self._alive = self.session.isalive()
+            self._alive_checked_at = now
+        return self._alive
+
+
+class SSHConnectionPool:
+    """
+    Keeps logged-in SSH sessions open between uses so that repeated discovery
+    of the same switch skips the SSH handshake and login.
+    Sessions are keyed by (host, port, username) and closed after idle_timeout,
+    or least recently used first once more than max_idle are open.
+    """
+    
+    def __init__(self, idle_timeout: float = 300.0, max_idle: int = 64):
+        """
+        Initialize the connection pool.
+        
+        Args:
+            idle_timeout: Seconds an unused session is kept open (default: 300)
+            max_idle: Most unused sessions kept open at once (default: 64)
+        """
+        self.idle_timeout = idle_timeout
+        self.max_idle = max_idle
+        self._idle: Dict[Tuple[str, int, str], Tuple[SSHClient, float]] = {}
+        self._lock = threading.Lock()
+        self.logger = get_logger(__name__)
+    
+    def acquire(self, host: str, username: str, password: str,
+                port: int = 22, timeout: int = 30,
+                attempts: int = 1, retry_delay: float = 2.0) -> Optional[SSHClient]:
+        """
+        Get a connected client, reusing an idle pooled session when possible.
+        
+        Args:
+            attempts: Connection attempts when the switch drops the connection before login
+            retry_delay: Base delay in seconds, doubled per retry with up to 50% jitter
+        
+        Returns:
+            Connected SSHClient, or None if a new connection could not be established
+        """
+        with self._lock:
+            expired = self._take_expired()
+            entry = self._idle.pop((host, port, username), None)
+        
+        for client in expired:
+            client.disconnect()
+        
+        if entry:
+            client = entry[0]
+            if client.password == password and client.is_connected_check():
+                self.logger.debug("Reusing pooled connection to %s", host)
+                return client
+            client.disconnect()
+        
+        for attempt in range(max(1, attempts)):
+            if attempt:
+                delay = min(30.0, retry_delay * 2 ** (attempt - 1)) * random.uniform(1.0, 1.5)
+                self.logger.debug("Retrying connection to %s in %.1fs", host, delay)
+                time.sleep(delay)
+            
+            client = SSHClient(host=host, username=username, password=password, port=port, timeout=timeout)
+            if client.connect():
+                return client
+            
+            # Rejected logins, refusals and timeouts would only fail again
+            if client.failure != 'closed':
+                break
+        
+        return None
+    
+    def release(self, client: SSHClient) -> None:
+        """Return a client to the pool, closing it if the session is no longer alive."""
+        if not client.is_connected_check():
+            client.disconnect()
+            return
+        
+        # The next user sets up its own prompt and pager patterns
+        client.prompt_pattern = None
+        client.pager_pattern = SSHClient.DEFAULT_PAGER_PATTERN
+        
+        with self._lock:
+            previous = self._idle.pop((client.host, client.port, client.username), None)
+            self._idle[(client.host, client.port, client.username)] = (client, time.monotonic())
+            
+            # Entries are kept in release order, so the oldest come first
+            evicted = []
+            while len(self._idle) > self.max_idle:
+                evicted.append(self._idle.pop(next(iter(self._idle)))[0])
+        
+        if previous and previous[0] is not client:
+            previous[0].disconnect()
+        for stale in evicted:
+            stale.disconnect()
+    
+    def close_all(self) -> None:
+        """Close every pooled session."""
+        with self._lock:
+            clients = [client for client, _ in self._idle.values()]
+            self._idle.clear()
+        
+        for client in clients:
+            client.disconnect()
+    
+    def _take_expired(self) -> List[SSHClient]:
+        """Remove and return sessions idle for longer than idle_timeout (caller holds the lock)."""
+        now = time.monotonic()
+        expired = [key for key, (_, released) in self._idle.items() if now - released > self.idle_timeout]
+        return [self._idle.pop(key)[0] for key in expired]
+
+
+class CommandCache:
+    """
+    Short-lived cache of read-only 'show' command output per host and user.
+    Lets vendor detection and discovery of the same switch share e.g. 'show version'.
+    """
+    
+    # Only side-effect free commands whose output rarely changes are cached
+    _RX_CACHEABLE = re.compile(r'^show\s+(?:lldp|mac|version|interfaces?|vlan|system)\b', re.IGNORECASE)
+    # Output that stopped at a pager prompt is incomplete and must not be reused
+    _RX_PAGER_HINT = re.compile(r'--\s*more\s*--|next page', re.IGNORECASE)
+    
+    def __init__(self, ttl: float = 30.0):
+        """
+        Initialize the command cache.
+        
+        Args:
+            ttl: Seconds a cached output stays valid (default: 30)
+        """
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, int, str, str], Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, client: SSHClient, command: str) -> Optional[str]:
+        """Return cached output of a command on the client's host, or None."""
+        if not self._RX_CACHEABLE.match(command):
+            return None
+        
+        key = (client.host, client.port, client.username, command)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() > entry[1]:
+                del self._entries[key]
+                return None
+            return entry[0]
+    
+    def put(self, client: SSHClient, command: str, output: str) -> None:
+        """Cache complete, non-empty output of a cacheable command."""
+        if not output or not self._RX_CACHEABLE.match(command) or self._RX_PAGER_HINT.search(output[-200:]):
+            return
+        
+        with self._lock:
+            self._entries[(client.host, client.port, client.username, command)] = (output, time.monotonic() + self.ttl)
+    
+    def invalidate(self, host: Optional[str] = None, command: Optional[str] = None) -> None:
+        """Drop cached output, optionally only for one host and/or command."""
+        with self._lock:
+            for key in [key for key in self._entries
+                        if (host is None or key[0] == host) and (command is None or key[3] == command)]:
+                del self._entries[key]
+
+
+# Shared pool used by the discovery classes
+connection_pool = SSHConnectionPool()
+atexit.register(connection_pool.close_all)
+
+# Shared by every SSHClient; read-only 'show' output is reused for a few seconds
+command_cache = CommandCache()
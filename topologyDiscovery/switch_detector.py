@@ -1,12 +1,36 @@
 """
 Switch Detector - Auto-detects switch vendor/type by trying different credentials and commands.
 """
+import json
+import logging
+import os
+import re
+import socket
+import tempfile
+import threading
 import yaml
 import time
+from collections import Counter
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional, Tuple
-from ssh_client import SSHClient
+from ssh_client import SSHClient, connection_pool
 from logging_config import get_logger
 
+# Vendors detected on earlier runs, so repeat discoveries can skip vendor probing
+VENDOR_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "onboard-switches", "vendor_map.json")
+VENDOR_CACHE_TTL = 24 * 60 * 60  # Seconds before a host is probed again
+
+# LibYAML-backed loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@lru_cache(maxsize=8)
+def _parse_credentials(path: str, mtime: float) -> dict:
+    """Parse a credentials file; cached per path and modification time, so edits are picked up."""
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=_YAML_LOADER)
+
 
 class SwitchDetector:
     """
@@ -14,17 +38,36 @@ class SwitchDetector:
     and running vendor-specific identification commands.
     """
     
-    def __init__(self, credentials_file: str = "credentials.yaml"):
+    MAX_PARALLEL_PROBES = 4  # Vendors probed at once per host, well below sshd's MaxStartups
+    
+    # Patterns are compiled once per process and shared by all instances
+    _RX_PAGER = re.compile(r'-- more --|next page: space', re.IGNORECASE)
+    
+    def __init__(self, credentials_file: str = "credentials.yaml",
+                 vendor_cache_file: Optional[str] = None):
         """
         Initialize the switch detector.
         
         Args:
             credentials_file: Path to credentials YAML file
+            vendor_cache_file: Where detected vendors are remembered between runs, e.g.
+                VENDOR_CACHE_FILE (default: None, nothing is read or written)
         """
         self.logger = get_logger(__name__)
         self.credentials = self._load_credentials(credentials_file)
+        self._credentials_path = os.path.abspath(credentials_file)
+        try:
+            self._credentials_mtime = os.path.getmtime(credentials_file)
+        except OSError:
+            self._credentials_mtime = 0.0
         self.ssh_settings = self.credentials.get('ssh_settings', {})
         
+        # host -> {"vendor", "username", "credentials_file", "last_seen"}; passwords are never written to disk
+        self.vendor_cache_file = vendor_cache_file
+        self._vendor_cache = self._load_vendor_cache()
+        self._vendor_cache_dirty = False
+        self._vendor_cache_lock = threading.Lock()
+        
         # Vendor detection commands - ordered by priority
         self.detection_commands = {
             'hirschmann': [
@@ -48,14 +91,32 @@ class SwitchDetector:
             'kontron': ['kontron', 'kswitch', 'istax', 'microchip istax', 'kontron kswitch'],
             'nomad': ['nomad']
         }
+        # Vendor owning each pattern, so a match names its vendor without another scan
+        self._pattern_vendor = {
+            pattern.lower(): vendor
+            for vendor, patterns in self.vendor_patterns.items() for pattern in patterns if pattern
+        }
+        
+        # Vendors identified by each detection command, and all of their patterns combined
+        self._command_vendors: Dict[str, List[str]] = {}
+        for vendor, commands in self.detection_commands.items():
+            for command in commands:
+                self._command_vendors.setdefault(command, []).append(vendor)
+        self._command_regex = {
+            command: re.compile('|'.join(re.escape(pattern) for vendor in vendors
+                                         for pattern in self.vendor_patterns.get(vendor, []) if pattern),
+                                re.IGNORECASE)
+            for command, vendors in self._command_vendors.items()
+            if any(pattern for vendor in vendors for pattern in self.vendor_patterns.get(vendor, []))
+        }
     
     def _load_credentials(self, credentials_file: str) -> dict:
         """Load credentials from YAML file."""
         try:
-            with open(credentials_file, 'r') as f:
-                return yaml.safe_load(f)
+            path = os.path.abspath(credentials_file)
+            return _parse_credentials(path, os.path.getmtime(path))
         except Exception as e:
-            self.logger.error(f"Error loading credentials: {e}")
+            self.logger.error("Error loading credentials: %s", e)
             return {}
     
     def detect_switch_type(self, host: str) -> Tuple[Optional[str], Optional[SSHClient], Optional[dict]]:
@@ -69,142 +130,308 @@ class SwitchDetector:
             Tuple of (vendor_name, ssh_client, credentials_used)
             Returns (None, None, None) if detection fails
         """
-        self.logger.info(f"Starting auto-detection for switch at {host}")
+        self.logger.info("Starting auto-detection for switch at %s", host)
         
-        for vendor, vendor_creds in self.credentials.get('credentials', {}).items():
-            self.logger.debug(f"  Trying {vendor} credentials...")
-            
-            # Try default credentials first
-            ssh_client, creds_used = self._try_vendor_credentials(host, vendor, vendor_creds)
-            
-            if ssh_client:
-                # Test if this is actually the right vendor
-                if self._confirm_vendor(ssh_client, vendor):
-                    self.logger.info(f"  ✓ Detected {vendor} switch at {host}")
-                    return vendor, ssh_client, creds_used
-                else:
-                    self.logger.debug(f"  ✗ Connected but not a {vendor} switch")
-                    ssh_client.disconnect()
-        
-        self.logger.warning(f"  ✗ Failed to detect switch type for {host}")
+        # A host that doesn't accept TCP on the SSH port would fail every vendor's login
+        if not self._is_reachable(host):
+            self.logger.warning("  ✗ %s is not reachable on SSH port %s", host, self.ssh_settings.get('port', 22))
+            return None, None, None
+        
+        cached = self._detect_from_cache(host)
+        if cached:
+            return cached
+        
+        vendors = self._vendors_by_likelihood()
+        if vendors:
+            # Probe all vendors at once; the first confirmed one wins
+            executor = ThreadPoolExecutor(max_workers=min(self.MAX_PARALLEL_PROBES, len(vendors)))
+            futures = [executor.submit(self._try_and_confirm, host, vendor, vendor_creds)
+                       for vendor, vendor_creds in vendors]
+            try:
+                for future in as_completed(futures):
+                    detected = future.result()
+                    if detected:
+                        vendor, ssh_client, creds_used = detected
+                        self.logger.info("  ✓ Detected %s switch at %s", vendor, host)
+                        self._remember_vendor(host, vendor, creds_used)
+                        futures.remove(future)
+                        return detected
+            finally:
+                # Don't wait for slower probes; hand their sessions back to the pool when they finish
+                executor.shutdown(wait=False, cancel_futures=True)
+                for future in futures:
+                    future.add_done_callback(self._release_probe)
+        
+        self.logger.warning("  ✗ Failed to detect switch type for %s", host)
         return None, None, None
     
-    def _try_vendor_credentials(self, host: str, vendor: str, vendor_creds: dict) -> Tuple[Optional[SSHClient], Optional[dict]]:
+    def _is_reachable(self, host: str) -> bool:
+        """Check that the SSH port accepts TCP connections before any SSH handshake."""
+        try:
+            with socket.create_connection((host, self.ssh_settings.get('port', 22)),
+                                          timeout=self.ssh_settings.get('probe_timeout', 1.0)):
+                return True
+        except OSError:
+            return False
+    
+    def _vendors_by_likelihood(self) -> List[Tuple[str, dict]]:
         """
-        Try to connect using vendor-specific credentials.
+        Order vendors so the most likely are probed first: by how many known hosts
+        they account for in the vendor cache, then by an optional 'priority' key
+        in their credentials entry, then in file order.
+        """
+        with self._vendor_cache_lock:
+            hits = Counter(entry.get('vendor') for entry in self._vendor_cache.values())
+        
+        return sorted(
+            self.credentials.get('credentials', {}).items(),
+            key=lambda item: (-hits[item[0]], -item[1].get('priority', 0))
+        )
+    
+    def _try_and_confirm(self, host: str, vendor: str, vendor_creds: dict) -> Optional[Tuple[str, SSHClient, dict]]:
+        """
+        Log in with a vendor's credentials and check which vendor the switch is from.
         
         Returns:
-            Tuple of (ssh_client, credentials_used) or (None, None) if failed
+            Tuple of (vendor_name, ssh_client, credentials_used), or None if not confirmed
+        """
+        self.logger.debug("  Trying %s credentials...", vendor)
+        
+        # Try default credentials first
+        ssh_client, creds_used = self._try_vendor_credentials(host, vendor, vendor_creds)
+        
+        if ssh_client:
+            # Test which vendor this actually is; the account may work on more than one
+            confirmed = self._confirm_vendor(ssh_client, vendor)
+            if confirmed:
+                if confirmed != vendor:
+                    self.logger.debug("  Logged in with %s credentials but found a %s switch", vendor, confirmed)
+                return confirmed, ssh_client, creds_used
+            
+            self.logger.debug("  ✗ Connected but not a %s switch", vendor)
+            connection_pool.release(ssh_client)  # Another vendor may log in with the same account
+        
+        return None
+    
+    @staticmethod
+    def _release_probe(future: Future) -> None:
+        """Return the session of a probe that finished after detection was decided."""
+        if not future.cancelled() and future.exception() is None and future.result():
+            connection_pool.release(future.result()[1])
+    
+    def _detect_from_cache(self, host: str) -> Optional[Tuple[str, SSHClient, dict]]:
+        """
+        Reuse a vendor detected on an earlier run by logging in with the same account.
+        The entry is dropped if the credentials file changed since, or the switch
+        no longer answers like that vendor.
+        
+        Returns:
+            Tuple of (vendor_name, ssh_client, credentials_used), or None to run full detection
         """
-        # Try default credentials
+        with self._vendor_cache_lock:
+            entry = self._vendor_cache.get(host)
+        
+        if not entry or time.time() - entry.get('last_seen', 0) > VENDOR_CACHE_TTL:
+            return None
+        
+        # Accounts may have changed since the entry was written, or come from another file
+        if (entry.get('credentials_file') != self._credentials_path
+                or entry.get('last_seen', 0) < self._credentials_mtime):
+            return None
+        
+        vendor = entry.get('vendor')
+        all_creds = self.credentials.get('credentials', {})
+        if vendor not in all_creds:
+            return None
+        
+        # The account may come from another vendor's list if it logged in there
+        vendor_creds = [all_creds[vendor]] + [creds for name, creds in all_creds.items() if name != vendor]
+        for creds in (c for v in vendor_creds for c in self._credential_candidates(v)):
+            if creds['username'] != entry.get('username'):
+                continue
+            
+            ssh_client = self._attempt_connection(host, creds)
+            if ssh_client:
+                # One detection command confirms the switch is still the same vendor
+                if self._confirm_vendor(ssh_client, vendor) == vendor:
+                    self.logger.info("  ✓ Using previously detected %s switch at %s", vendor, host)
+                    return vendor, ssh_client, creds
+                connection_pool.release(ssh_client)
+                break
+        
+        self.logger.debug("  Cached vendor for %s no longer works, probing again", host)
+        with self._vendor_cache_lock:
+            if self._vendor_cache.pop(host, None) is not None:
+                self._vendor_cache_dirty = True
+        return None
+    
+    def _remember_vendor(self, host: str, vendor: str, credentials: dict) -> None:
+        """Record a detected vendor and the account that logged in."""
+        with self._vendor_cache_lock:
+            self._vendor_cache[host] = {
+                'vendor': vendor,
+                'username': credentials['username'],
+                'credentials_file': self._credentials_path,
+                'last_seen': time.time()
+            }
+            self._vendor_cache_dirty = True
+    
+    def _load_vendor_cache(self) -> Dict[str, dict]:
+        """Load the vendor cache written by earlier runs."""
+        if not self.vendor_cache_file:
+            return {}
+        try:
+            with open(self.vendor_cache_file, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.logger.debug("Ignoring unreadable vendor cache: %s", e)
+            return {}
+    
+    def save_vendor_cache(self) -> None:
+        """Write the vendor cache atomically if anything was detected since loading it."""
+        with self._vendor_cache_lock:
+            if not self.vendor_cache_file or not self._vendor_cache_dirty:
+                return
+            snapshot = dict(self._vendor_cache)
+            self._vendor_cache_dirty = False
+        
+        try:
+            directory = os.path.dirname(self.vendor_cache_file)
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=directory, delete=False) as f:
+                json.dump(snapshot, f)
+            os.replace(f.name, self.vendor_cache_file)
+        except Exception as e:
+            self.logger.debug("Could not save vendor cache: %s", e)
+    
+    def _credential_candidates(self, vendor_creds: dict) -> List[dict]:
+        """Return the default credentials followed by the alternatives for a vendor."""
         default_creds = {
             'username': vendor_creds.get('default_username'),
             'password': vendor_creds.get('default_password')
         }
+        return [default_creds] + list(vendor_creds.get('alternative_credentials', []))
+    
+    def _try_vendor_credentials(self, host: str, vendor: str, vendor_creds: dict) -> Tuple[Optional[SSHClient], Optional[dict]]:
+        """
+        Try to connect using vendor-specific credentials.
         
-        ssh_client = self._attempt_connection(host, default_creds)
-        if ssh_client:
-            return ssh_client, default_creds
-        
-        # Try alternative credentials
-        for alt_creds in vendor_creds.get('alternative_credentials', []):
-            ssh_client = self._attempt_connection(host, alt_creds)
+        Returns:
+            Tuple of (ssh_client, credentials_used) or (None, None) if failed
+        """
+        # Try default credentials first, then the alternatives
+        for creds in self._credential_candidates(vendor_creds):
+            ssh_client = self._attempt_connection(host, creds)
             if ssh_client:
-                return ssh_client, alt_creds
+                return ssh_client, creds
         
         return None, None
     
     def _attempt_connection(self, host: str, credentials: dict) -> Optional[SSHClient]:
         """
-        Attempt SSH connection with given credentials.
+        Attempt SSH connection with given credentials, reusing a pooled session if one is open.
         
         Returns:
             SSHClient if successful, None if failed
         """
         try:
-            ssh_client = SSHClient(
+            ssh_client = connection_pool.acquire(
                 host=host,
                 username=credentials['username'],
                 password=credentials['password'],
                 port=self.ssh_settings.get('port', 22),
-                timeout=self.ssh_settings.get('timeout', 30)
+                timeout=self.ssh_settings.get('timeout', 30),
+                attempts=self.ssh_settings.get('retry_attempts', 1),
+                retry_delay=self.ssh_settings.get('retry_delay', 2)
             )
             
-            if ssh_client.connect():
+            if ssh_client:
                 return ssh_client
                 
         except Exception as e:
-            self.logger.debug(f"    Connection failed: {e}")
+            self.logger.debug("    Connection failed: %s", e)
         
         return None
     
-    def _confirm_vendor(self, ssh_client: SSHClient, vendor: str) -> bool:
+    def _confirm_vendor(self, ssh_client: SSHClient, vendor: str) -> Optional[str]:
         """
         Confirm the vendor by running vendor-specific commands and checking output.
+        Each output is scanned once with the patterns of every vendor identified by the
+        same command, so a single 'show version' tells Kontron and Nomad apart; the
+        earliest match in the output names the vendor.
         
         Args:
             ssh_client: Connected SSH client
-            vendor: Vendor name to confirm
+            vendor: Vendor whose credentials logged in
             
         Returns:
-            True if vendor confirmed, False otherwise
+            Vendor the output belongs to, or None if no patterns matched
         """
         commands = self.detection_commands.get(vendor, [])
-        patterns = self.vendor_patterns.get(vendor, [])
         
         for command in commands:
+            command_regex = self._command_regex.get(command)
             try:
                 # Use pager handling for commands that might have long output
-                output = self._send_command_with_pager(ssh_client, command, 5.0)
+                output = self._send_command_with_pager(ssh_client, command, 5.0, command_regex)
                 
                 if output:
                     # Check if output contains vendor-specific patterns
-                    output_lower = output.lower()
-                    for pattern in patterns:
-                        if pattern.lower() in output_lower:
-                            self.logger.debug(f"    ✓ Confirmed {vendor} - found '{pattern}' in output")
-                            return True
+                    match = command_regex.search(output) if command_regex else None
+                    if match:
+                        candidate = self._pattern_vendor[match.group(0).lower()]
+                        self.logger.debug("    ✓ Confirmed %s - found '%s' in output", candidate, match.group(0))
+                        return candidate
                     
                     # Debug: Show what we got vs what we're looking for
-                    self.logger.debug(f"    ✗ Output received but no patterns matched")
-                    self.logger.debug(f"    Looking for: {patterns}")
-                    self.logger.debug(f"    Output preview: {output[:200]}...")
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug("    ✗ Output received but no patterns matched")
+                        self.logger.debug("    Looking for: %s",
+                                          [self.vendor_patterns.get(c, []) for c in self._command_vendors[command]])
+                        self.logger.debug("    Output preview: %s...", output[:200])
                 
             except Exception as e:
-                self.logger.debug(f"    Command '{command}' failed: {e}")
+                self.logger.debug("    Command '%s' failed: %s", command, e)
                 continue
         
-        return False
+        return None
     
-    def _send_command_with_pager(self, ssh_client: SSHClient, command: str, timeout: float) -> str:
+    def _send_command_with_pager(self, ssh_client: SSHClient, command: str, timeout: float,
+                                 early_exit_regex: Optional[re.Pattern] = None) -> str:
         """
         Send command and handle potential pager interaction for vendor confirmation.
+        Paging stops as soon as early_exit_regex matches or after max_pages; a pager
+        still waiting is then left with 'q'.
         """
+        output = ""
         try:
             # Send the initial command
             output = ssh_client.send_command_to_shell(command, timeout)
+            page = output
             
-            # Check if there's a pager prompt (-- more --)
-            if output and ("-- more --" in output.lower() or "next page: space" in output.lower()):
-                full_output = output
-                
-                # Keep sending spaces to get more content until no more pager prompts
-                max_pages = 5  # Limit for vendor detection
-                page_count = 0
-                
-                while ("-- more --" in full_output.lower() or "next page: space" in full_output.lower()) and page_count < max_pages:
-                    # Send space to continue
-                    additional_output = ssh_client.send_command_to_shell(" ", timeout)
-                    if additional_output:
-                        full_output += "\n" + additional_output
-                    page_count += 1
+            # Keep sending spaces while the latest page ends at a pager prompt (-- more --)
+            max_pages = 5  # Limit for vendor detection
+            page_count = 0
+            
+            while page and self._RX_PAGER.search(page):
+                # Pages break between lines, so each page only needs scanning once
+                if page_count >= max_pages or (early_exit_regex and early_exit_regex.search(page)):
+                    # Leave the pager, so the session is back at the prompt when it is reused
+                    ssh_client.send_command_to_shell("q", 0.5)
+                    break
                 
-                return full_output
+                # Send space to continue
+                page = ssh_client.send_command_to_shell(" ", timeout)
+                if page:
+                    output += "\n" + page
+                page_count += 1
             
             return output
             
         except Exception:
-            return output if output else ""
+            return output
     
     def get_vendor_commands(self, vendor: str) -> dict:
         """
@@ -0,0 +1,75 @@
+"""
+Minimal switch CLI run on a pty by the SSHClient tests.
+Prints PROMPT, echoes input through the tty, pages long output behind PAGER
+and reads the pager key without waiting for a newline, like a real switch.
+"""
+import os
+import sys
+import termios
+import time
+import tty
+
+PROMPT = os.environ.get("PROMPT", "switch#")
+PAGER = os.environ.get("PAGER", "-- more --")
+
+# Command -> pages of output lines; PAUSE stalls the output for a moment
+OUTPUT = {
+    "show version": [
+        ["Line 1", "Line 2"],
+        ["Kontron KSwitch line 3", "Line 4"],
+    ],
+    "show lldp neighbors": [
+        ["Local Interface    : 10G 1/1", "System Description : <KSwitch>", "PAUSE",
+         "Management Address : 10.0.0.2 (IPv4)"],
+    ],
+    "show interfaces": [
+        ["Interface 1/1 up"],
+        ["Interface 1/2 up"],
+        ["Interface 1/3 down"],
+    ],
+    "terminal length 0": [[]],
+}
+OUTPUT["show log"] = [["Log entry %d" % number] for number in range(1, 9)]
+
+
+def read_key() -> bytes:
+    """Read one key press in cbreak mode."""
+    saved = termios.tcgetattr(0)
+    tty.setcbreak(0)
+    try:
+        return os.read(0, 1)
+    finally:
+        termios.tcsetattr(0, termios.TCSANOW, saved)
+
+
+def main() -> None:
+    out = sys.stdout
+    out.write(PROMPT)
+    out.flush()
+
+    for line in sys.stdin:
+        command = line.strip()
+        pages = OUTPUT.get(command, [[]] if not command else [["% Unknown command"]])
+
+        for number, page in enumerate(pages):
+            for text in page:
+                if text == "PAUSE":
+                    out.flush()
+                    time.sleep(0.7)
+                else:
+                    out.write(text + "\r\n")
+
+            if number < len(pages) - 1:
+                out.write(PAGER)
+                out.flush()
+                key = read_key()
+                out.write("\r" + " " * len(PAGER) + "\r")
+                if key == b"q":
+                    break
+
+        out.write(PROMPT)
+        out.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Parser tests against captured CLI output.
+Expected values are what the original line-by-line parsers returned for the same fixtures.
+"""
+from pathlib import Path
+
+import pytest
+
+from discovery import HirschmannDiscovery, KontronDiscovery, NomadDiscovery
+from data_model import NeighborInfo
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _read(name: str) -> str:
+    return (FIXTURES / name).read_text()
+
+
+@pytest.mark.parametrize("discovery_class, fixture, expected", [
+    (HirschmannDiscovery, "hirschmann_lldp_remote_data.txt", [
+        NeighborInfo(ip="10.0.0.2", mac="00:80:63:aa:bb:01", type="hirschmann"),
+        # The last of two management addresses wins
+        NeighborInfo(ip="10.0.0.33", mac="ec:e5:55:00:11:22", type="kontron"),
+        NeighborInfo(ip="10.0.0.5", mac=None, type="unknown"),
+        NeighborInfo(ip="10.0.0.6", mac="00:1b:1e:00:00:05", type="nomad"),
+    ]),
+    (KontronDiscovery, "kontron_lldp_neighbors.txt", [
+        NeighborInfo(ip="10.0.0.2", mac="00-80-63-AA-BB-01", type="hirschmann"),
+        NeighborInfo(ip="10.0.0.6", mac="00-1B-1E-00-00-05", type="nomad"),
+        NeighborInfo(ip="10.0.0.7", mac=None, type="lantech"),
+    ]),
+    # The original parser stored the whole 'Chassis ID : ...' match as the MAC; only the address is kept now
+    (NomadDiscovery, "nomad_lldp_neighbors.txt", [
+        NeighborInfo(ip="10.0.0.2", mac="00:80:63:aa:bb:01", type="hirschmann"),
+        NeighborInfo(ip="10.0.0.3", mac="ec:e5:55:00:11:22", type="kontron"),
+        NeighborInfo(ip="10.0.0.6", mac="00:1b:1e:00:00:05", type="nomad"),
+    ]),
+])
+def test_parse_lldp_neighbors(discovery_class, fixture, expected):
+    discovery = discovery_class("192.0.2.1", "user", "secret")
+    assert discovery._parse_lldp_neighbors(_read(fixture)) == expected
+
+
+@pytest.mark.parametrize("discovery_class, fixture, expected", [
+    (HirschmannDiscovery, "hirschmann_system_info.txt",
+     {"vendor": "hirschmann", "ip": "192.0.2.1", "mac": "00:80:63:aa:bb:00"}),
+    (KontronDiscovery, "kontron_show_version.txt",
+     {"vendor": "kontron", "ip": "192.0.2.1", "mac": "EC-E5-55-00-11-20"}),
+    (NomadDiscovery, "nomad_show_version.txt",
+     {"vendor": "lantech", "ip": "192.0.2.1", "mac": "00:1b:1e:00:00:01"}),
+])
+def test_parse_basic_info(discovery_class, fixture, expected):
+    discovery = discovery_class("192.0.2.1", "user", "secret")
+    assert discovery._parse_basic_info(_read(fixture)) == expected
+
+
+@pytest.mark.parametrize("description, vendor", [
+    ("Hirschmann Railway Switch", "hirschmann"),
+    ("HiOS-2A-09.0", "hirschmann"),
+    ("Lantech TPES-L2", "lantech"),
+    ("Microchip iStaX Switch", "kontron"),
+    ("Nomad gateway", "nomad"),
+    ("Linux server", "unknown"),
+    # The leftmost vendor token decides
+    ("Nomad uplink to Hirschmann", "nomad"),
+])
+def test_classify_vendor(description, vendor):
+    assert HirschmannDiscovery._classify_vendor(description) == vendor
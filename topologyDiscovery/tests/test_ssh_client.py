@@ -0,0 +1,133 @@
+"""
+SSHClient tests against a fake switch CLI on a local pty.
+"""
+import os
+import re
+import sys
+from pathlib import Path
+
+import pexpect
+import pytest
+
+from discovery import KontronDiscovery
+from ssh_client import SSHClient, SSHConnectionPool, command_cache
+from switch_detector import SwitchDetector
+
+FAKE_CLI = Path(__file__).parent / "fake_cli.py"
+CREDENTIALS = Path(__file__).parent.parent / "credentials.yaml"
+
+SHOW_VERSION = ["Line 1", "Line 2", "Kontron KSwitch line 3", "Line 4"]
+SHOW_LLDP = ["Local Interface    : 10G 1/1", "System Description : <KSwitch>",
+             "Management Address : 10.0.0.2 (IPv4)"]
+
+
+@pytest.fixture(autouse=True)
+def clear_command_cache():
+    command_cache.invalidate()
+    yield
+    command_cache.invalidate()
+
+
+@pytest.fixture
+def cli():
+    """Factory for an SSHClient attached to a fresh fake CLI instead of ssh."""
+    clients = []
+
+    def start(prompt: str = "switch#", prompt_pattern=None, pager_pattern=None,
+              pager: str = "-- more --") -> SSHClient:
+        client = SSHClient("192.0.2.1", "user", "secret")
+        client.session = pexpect.spawn(sys.executable, [str(FAKE_CLI)],
+                                       env=dict(os.environ, PROMPT=prompt, PAGER=pager))
+        client.session.expect_exact(prompt)
+        client.is_connected = True
+        client.prompt_pattern = prompt_pattern
+        if pager_pattern is not None:
+            client.pager_pattern = pager_pattern
+        clients.append(client)
+        return client
+
+    yield start
+    for client in clients:
+        client.disconnect()
+
+
+def _lines(output: str) -> list:
+    """Output lines without the trailing prompt a non-prompt read keeps."""
+    return [line for line in output.splitlines() if line != "switch#"]
+
+
+@pytest.mark.parametrize("prompt_pattern", [None, re.compile(rb"switch#\s*$")])
+def test_single_command_pages_through_client_pager(cli, prompt_pattern):
+    client = cli(prompt_pattern=prompt_pattern, pager_pattern=re.compile(rb"-- more --"))
+    assert _lines(client.send_command_to_shell("show version", 1.0)) == SHOW_VERSION
+
+
+@pytest.mark.parametrize("prompt_pattern", [None, re.compile(rb"switch#\s*$")])
+def test_batched_commands_keep_their_own_output(cli, prompt_pattern):
+    client = cli(prompt_pattern=prompt_pattern, pager_pattern=re.compile(rb"-- more --"))
+    version, lldp = client.send_commands_to_shell(["show version", "show lldp neighbors"], 1.0)
+    assert _lines(version) == SHOW_VERSION
+    assert "Kontron KSwitch line 3" not in lldp
+    assert "Management Address : 10.0.0.2 (IPv4)" in lldp
+
+
+@pytest.mark.parametrize("prompt_pattern", [None, re.compile(rb"switch#\s*$")])
+def test_istax_pager_line_is_answered_once_per_page(cli, prompt_pattern):
+    client = cli(prompt_pattern=prompt_pattern, pager_pattern=KontronDiscovery._RX_PAGER,
+                 pager="-- more --, next page: Space, continue: g, quit: ^C")
+    output = client.send_command_to_shell("show interfaces", 1.0)
+    assert _lines(output) == ["Interface 1/1 up", "Interface 1/2 up", "Interface 1/3 down"]
+    # A second space per page would have been read as an empty command
+    assert _lines(client.send_command_to_shell("terminal length 0", 1.0)) == []
+
+
+def test_blank_command_keeps_first_page_line(cli):
+    # The default '--More--' pager pattern does not match, so the detector turns the page itself
+    client = cli()  # Detection reads without a prompt pattern
+    detector = SwitchDetector(str(CREDENTIALS))
+    output = detector._send_command_with_pager(client, "show version", 1.0)
+    assert "Kontron KSwitch line 3" in output.splitlines()
+
+
+def test_detection_paging_leaves_the_pager_at_max_pages(cli):
+    client = cli()  # Detection reads without a prompt pattern
+    detector = SwitchDetector(str(CREDENTIALS))
+    output = detector._send_command_with_pager(client, "show log", 1.0)
+    assert "Log entry 6" in output and "Log entry 8" not in output
+    # Back at the prompt: the next command is not typed into the pager
+    assert _lines(client.send_command_to_shell("terminal length 0", 1.0)) == []
+
+
+def test_release_resets_prompt_and_pager_patterns(cli):
+    client = cli(prompt_pattern=re.compile(rb"switch#\s*$"), pager_pattern=KontronDiscovery._RX_PAGER)
+    pool = SSHConnectionPool()
+    pool.release(client)
+    assert client.prompt_pattern is None
+    assert client.pager_pattern == SSHClient.DEFAULT_PAGER_PATTERN
+
+
+@pytest.mark.parametrize("line, command, is_echo", [
+    ("show version", "show version", True),
+    ("switch#show version", "show version", True),
+    ("(BXP) # show version", "show version", True),
+    ("Kontron KSwitch line 3", " ", False),
+    ("Kontron KSwitch line 3", "", False),
+    ("Last command: show version", "show version", False),
+])
+def test_is_echo(line, command, is_echo):
+    assert SSHClient._is_echo(line, command) is is_echo
+
+
+@pytest.mark.parametrize("prompt", ["switch#", "KSwitch>", "(BXP) #"])
+def test_learnt_prompt_ignores_output_ending_in_prompt_chars(cli, prompt):
+    client = cli(prompt=prompt)
+    assert client.learn_prompt(1.0)
+    # The output pauses right after a line ending in '>'
+    output = client.send_command_to_shell("show lldp neighbors", 1.0)
+    assert output.splitlines() == SHOW_LLDP
+
+
+def test_learn_prompt_without_prompt_falls_back_to_idle_reads(cli):
+    client = cli(prompt="ready")
+    assert not client.learn_prompt(1.0)
+    assert client.prompt_pattern is None